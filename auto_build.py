@@ -1,23 +1,55 @@
 from http.server import HTTPServer, SimpleHTTPRequestHandler
 from packaging.version import InvalidVersion
 from packaging import version
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 from datetime import datetime
 from typing import Tuple
+from typing import Any
 from typing import List
 from typing import Dict
 
 import xml.etree.ElementTree as ET
+import contextlib
+import functools
+import cProfile
+import atexit
+import pstats
+import socketserver
+import email.utils
 import subprocess
+import argparse
+import socket
+import sys
 import threading
+import traceback
 import requests
 import hashlib
 import shutil
 import json
 import glob
 import stat
+import time
 import os
 import re
 
+try:
+	# Optional. Without it the daemon polls MAVEN_PROJECTS_DIRECTORY for changes.
+	import inotify_simple
+except ImportError:
+	inotify_simple = None
+
+try:
+	# Needed for CPU time and peak memory of maven runs in BUILD_HISTORY_FILE. Without it only CPU time is taken from resource module, which is not available on Windows.
+	import psutil
+except ImportError:
+	psutil = None
+
+try:
+	import resource
+except ImportError:
+	resource = None
+
 # When true, this script will run as repository server and will not compile anything
 RUN_AS_REPOSITORY_SERVER = False
 
@@ -86,6 +118,58 @@ LIBRARY_OVERRIDE = {
 
 REPOSITORY_SERVER_PORT = 8001
 
+# How much the repository server prints: "quiet" nothing, "info" one line per request, "debug" everything.
+REPOSITORY_SERVER_LOG_LEVEL = "info"
+
+# Repository server answers with its metrics as JSON at this path.
+METRICS_PATH = "/__metrics__"
+
+# Repository server metrics are saved to this file every METRICS_SNAPSHOT_INTERVAL seconds. 0 disables saving.
+METRICS_SNAPSHOT_FILE:str = ".\\repository_metrics.json"
+METRICS_SNAPSHOT_INTERVAL = 60
+
+# How many 3rd party artifacts are downloaded at the same time before the compilation starts.
+PREFETCH_WORKER_COUNT = 8
+
+# When true, nothing is downloaded from MAVEN_REPOS. Build fails before running maven if some 3rd party artifact is missing from local repository.
+OFFLINE_MODE = False
+
+# Requested paths of every build target are saved here. They are used for warming up the repository server on the next build of the same target.
+ACCESS_PROFILE_DIRECTORY:str = ".\\.access_profiles\\"
+
+# How many bytes of small, often requested files the repository server keeps in memory.
+HOT_FILE_CACHE_BYTE_BUDGET = 64 * 1024 * 1024
+
+# Files bigger than this are always streamed from disk by the repository server.
+HOT_FILE_CACHE_MAX_FILE_SIZE = 256 * 1024
+
+# Packaging of 3rd party pom -> extension of the artifact file next to the pom. Packagings not listed here use packaging as extension.
+ARTIFACT_EXTENSION_BY_PACKAGING = {
+	"jar": "jar",
+	"bundle": "jar",
+	"maven-plugin": "jar",
+	"eclipse-plugin": "jar",
+	"ejb": "jar",
+	"pom": None,
+}
+
+# Build daemon listens build requests on this port (localhost only).
+DAEMON_PORT = 8002
+
+# How often the build daemon checks MAVEN_PROJECTS_DIRECTORY for changes when inotify is not available. Seconds.
+DAEMON_POLL_INTERVAL = 2.0
+
+# Generated ModelsBase trees by content of models.xml and generator version.
+MODELS_BASE_CACHE_DIRECTORY:str = ".\\models_base_cache\\"
+
+# Wall-clock time, CPU time and peak memory of every maven run are saved here. They are used for predicting build time and for scheduling.
+BUILD_HISTORY_FILE:str = ".\\.build_history.json"
+
+# How many latest runs per module are used for predictions.
+BUILD_HISTORY_LENGTH = 5
+
+MAVEN_EXECUTABLE = "mvn.bat"
+
 MAVEN_FLASH_GENERATOR = "platform.server.tools.generator.maven:Flash:1.0.2.0" 
 
 maven_environment = os.environ.copy()  # Copy current environment variables
@@ -107,39 +191,555 @@ class Bcolors:
 def color_print(bcolor:str, text:str, end:str = "\n") -> None:
 	print(bcolor + text + Bcolors.ENDC, end=end)
 
+class NoSpan:
+	"""Span that is used when tracing is disabled. Does nothing."""
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *_):
+		return False
+
+	def add_bytes(self, byte_count:int):
+		pass
+
+NO_SPAN = NoSpan()
+
+class Span:
+	def __init__(self, tracer, name:str, signature:None | str, args:Dict[str, Any]):
+		self.tracer = tracer
+		self.name:str = name
+		self.args:Dict[str, Any] = args
+		if signature is not None:
+			self.args["signature"] = signature
+		self.start:int = 0
+
+	def __enter__(self):
+		self.start = time.perf_counter_ns()
+		return self
+
+	def __exit__(self, *_):
+		self.tracer.add_span(self.name, self.start, time.perf_counter_ns(), threading.get_ident(), self.args)
+		return False
+
+	def add_bytes(self, byte_count:int):
+		self.args["bytes"] = self.args.get("bytes", 0) + byte_count
+
+class Tracer:
+	"""
+	Records timed spans of the build. Disabled by default, then span() returns NO_SPAN and costs only one attribute check.
+	Spans can be exported as Chrome/Perfetto trace JSON (chrome://tracing, ui.perfetto.dev) and as a plain-text summary.
+	"""
+
+	def __init__(self):
+		self.enabled:bool = False
+		self.lock = threading.Lock()
+		self.origin:int = time.perf_counter_ns()
+		# (name, start ns, end ns, thread id, args)
+		self.spans:List[Tuple[str, int, int, int, Dict[str, Any]]] = []
+		self.mapping_profiler:None | cProfile.Profile = None
+
+	def span(self, name:str, signature:None | str = None, **args):
+		if not self.enabled:
+			return NO_SPAN
+		return Span(self, name, signature, args)
+
+	def add_span(self, name:str, start:int, end:int, thread_id:int, args:Dict[str, Any]):
+		with self.lock:
+			self.spans.append((name, start, end, thread_id, args))
+
+	@contextlib.contextmanager
+	def profile_mapping(self):
+		"""Run the block under cProfile if mapping phase profiling is enabled. Profiles of many blocks are accumulated."""
+		if self.mapping_profiler is None:
+			yield
+			return
+
+		self.mapping_profiler.enable()
+		try:
+			yield
+		finally:
+			self.mapping_profiler.disable()
+
+	def export_chrome_trace(self, trace_file_path:str):
+		with self.lock:
+			spans = list(self.spans)
+
+		events:List[Dict[str, Any]] = []
+		for name, start, end, thread_id, args in spans:
+			events.append({"name": name, "ph": "X", "ts": (start - self.origin) / 1000, "dur": (end - start) / 1000, "pid": os.getpid(), "tid": thread_id, "args": args})
+
+		with open(trace_file_path, "w") as f:
+			json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+	def summary(self, top_n:int) -> str:
+		"""Total time by span name and top_n longest single spans."""
+		with self.lock:
+			spans = list(self.spans)
+
+		totals_by_name:Dict[str, List[float]] = {}
+		for name, start, end, _, args in spans:
+			totals:List[float] = totals_by_name.setdefault(name, [0, 0.0, 0.0, 0])
+			duration:float = (end - start) / 1e9
+			totals[0] += 1
+			totals[1] += duration
+			totals[2] = max(totals[2], duration)
+			totals[3] += args.get("bytes", 0)
+
+		lines:List[str] = ["Time by span (count, total s, max s, bytes):"]
+		for name, (count, total, maximum, byte_count) in sorted(totals_by_name.items(), key=lambda item: -item[1][1])[:top_n]:
+			lines.append(f"  {name:<28} {int(count):>7} {total:>10.3f} {maximum:>9.3f} {int(byte_count):>12}")
+
+		lines.append("Longest spans:")
+		for name, start, end, _, args in sorted(spans, key=lambda span: span[1] - span[2])[:top_n]:
+			lines.append(f"  {(end - start) / 1e9:>10.3f} s  {name}  {args.get('signature', args.get('path', args.get('url', '')))}")
+		return "\n".join(lines)
+
+	def export(self, trace_file_path:str, top_n:int):
+		self.export_chrome_trace(trace_file_path)
+		summary:str = self.summary(top_n)
+		with open(trace_file_path + ".txt", "w") as f:
+			f.write(summary + "\n")
+		print(summary)
+		color_print(Bcolors.OKGREEN, "Trace saved to " + trace_file_path + " and " + trace_file_path + ".txt")
+
+		if self.mapping_profiler is not None:
+			self.mapping_profiler.dump_stats(trace_file_path + ".mapping.prof")
+			pstats.Stats(self.mapping_profiler).sort_stats("cumulative").print_stats(top_n)
+			color_print(Bcolors.OKGREEN, "Mapping phase profile saved to " + trace_file_path + ".mapping.prof")
+
+tracer = Tracer()
+
+def traced(name:str):
+	"""Decorator that records a span for every call. If the first argument is PomInfo or path, its signature or the path is added to the span."""
+	def decorator(function):
+		@functools.wraps(function)
+		def wrapper(*args, **kwargs):
+			if not tracer.enabled:
+				return function(*args, **kwargs)
+			if args and isinstance(args[0], PomInfo):
+				span = tracer.span(name, args[0].signature)
+			elif args and isinstance(args[0], str):
+				span = tracer.span(name, path=args[0])
+			else:
+				span = tracer.span(name)
+			with span:
+				return function(*args, **kwargs)
+		return wrapper
+	return decorator
+
 def download_file(url:str) -> None | bytes:
-	try:
-		response = requests.get(url)
-		response.raise_for_status()  # Raise an exception for HTTP errors (e.g., 404)
-		content = response.content
-		return content
-	except requests.exceptions.HTTPError as http_err:
-		color_print(Bcolors.FAIL, f"HTTP error occurred: {http_err}")
-	except requests.exceptions.RequestException as req_err:
-		color_print(Bcolors.FAIL, f"Request error occurred: {req_err}")
+	with tracer.span("download", url=url) as span:
+		try:
+			response = requests.get(url)
+			response.raise_for_status()  # Raise an exception for HTTP errors (e.g., 404)
+			content = response.content
+			span.add_bytes(len(content))
+			return content
+		except requests.exceptions.HTTPError as http_err:
+			color_print(Bcolors.FAIL, f"HTTP error occurred: {http_err}")
+		except requests.exceptions.RequestException as req_err:
+			color_print(Bcolors.FAIL, f"Request error occurred: {req_err}")
 	
 	return None  # Return None if the download was unsuccessful
 
+REPOSITORY_SERVER_LOG_LEVELS:List[str] = ["quiet", "info", "debug"]
+
+def server_log(level:str, bcolor:str, text:str):
+	"""Print repository server log line if REPOSITORY_SERVER_LOG_LEVEL is level or more verbose."""
+	if REPOSITORY_SERVER_LOG_LEVELS.index(level) <= REPOSITORY_SERVER_LOG_LEVELS.index(REPOSITORY_SERVER_LOG_LEVEL):
+		color_print(bcolor, text)
+
+class RepositoryMetrics:
+	"""Request counts by outcome, latency histograms, bytes served and upstream time by mirror of the repository server."""
+
+	OUTCOMES = ["local_hit", "override", "metadata", "checksum", "upstream_hit", "upstream_miss", "local_prefix_404"]
+
+	# Upper bounds of latency histogram buckets in milliseconds. Last bucket is everything slower.
+	LATENCY_BUCKETS_MS = [1, 5, 10, 50, 100, 500, 1000, 5000]
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.start_time:float = time.time()
+		self.requests_by_outcome:Dict[str, int] = {outcome: 0 for outcome in self.OUTCOMES}
+		self.latency_histogram_by_outcome:Dict[str, List[int]] = {outcome: [0] * (len(self.LATENCY_BUCKETS_MS) + 1) for outcome in self.OUTCOMES}
+		self.latency_total_by_outcome:Dict[str, float] = {outcome: 0.0 for outcome in self.OUTCOMES}
+		self.bytes_served:int = 0
+		# Mirror url -> {"requests": ..., "found": ..., "seconds": ...}
+		self.upstream_by_mirror:Dict[str, Dict[str, float]] = {}
+
+	def record_request(self, outcome:str, duration:float, bytes_served:int):
+		bucket:int = len(self.LATENCY_BUCKETS_MS)
+		for i, bucket_upper_bound in enumerate(self.LATENCY_BUCKETS_MS):
+			if duration * 1000 <= bucket_upper_bound:
+				bucket = i
+				break
+
+		with self.lock:
+			self.requests_by_outcome[outcome] += 1
+			self.latency_histogram_by_outcome[outcome][bucket] += 1
+			self.latency_total_by_outcome[outcome] += duration
+			self.bytes_served += bytes_served
+
+	def record_upstream(self, mirror:str, duration:float, found:bool):
+		with self.lock:
+			mirror_metrics:Dict[str, float] = self.upstream_by_mirror.setdefault(mirror, {"requests": 0, "found": 0, "seconds": 0.0})
+			mirror_metrics["requests"] += 1
+			mirror_metrics["found"] += 1 if found else 0
+			mirror_metrics["seconds"] += duration
+
+	def snapshot(self) -> Dict[str, Any]:
+		with self.lock:
+			bucket_names:List[str] = ["<=" + str(bucket_upper_bound) + "ms" for bucket_upper_bound in self.LATENCY_BUCKETS_MS] + [">" + str(self.LATENCY_BUCKETS_MS[-1]) + "ms"]
+			return {
+				"timestamp": time.time(),
+				"uptime_seconds": time.time() - self.start_time,
+				"requests": dict(self.requests_by_outcome),
+				"latency_histogram": {outcome: dict(zip(bucket_names, histogram)) for outcome, histogram in self.latency_histogram_by_outcome.items()},
+				"latency_seconds_total": dict(self.latency_total_by_outcome),
+				"bytes_served": self.bytes_served,
+				"upstream": {mirror: dict(mirror_metrics) for mirror, mirror_metrics in self.upstream_by_mirror.items()},
+				"hot_file_cache": hot_file_cache.stats(),
+			}
+
+repository_metrics = RepositoryMetrics()
+
+def write_metrics_snapshots():
+	"""Save repository metrics to METRICS_SNAPSHOT_FILE every METRICS_SNAPSHOT_INTERVAL seconds."""
+	while True:
+		time.sleep(METRICS_SNAPSHOT_INTERVAL)
+		snapshot_temporary_path:str = METRICS_SNAPSHOT_FILE + ".part"
+		try:
+			with open(snapshot_temporary_path, "w") as f:
+				json.dump(repository_metrics.snapshot(), f, indent=2)
+			os.replace(snapshot_temporary_path, METRICS_SNAPSHOT_FILE)
+		except OSError as e:
+			# For example the snapshot file is open in an editor on Windows. Try again on the next round.
+			server_log("info", Bcolors.WARNING, "Failed to save metrics snapshot to " + METRICS_SNAPSHOT_FILE + ": " + str(e))
+
 def download_file_from_3rd_repos(path) -> None | bytes:
 	path_local = os.path.join(LOCAL_REPOSITORY_DIRECTORY, path)
 	if os.path.exists(path_local):
 		with open(path_local, "rb") as file:
 			return file.read()
-			
+
+	if OFFLINE_MODE:
+		return None
+
 	for maven_repo_url in MAVEN_REPOS:
+		start_time:float = time.perf_counter()
 		file_data = download_file(maven_repo_url + path)
+		repository_metrics.record_upstream(maven_repo_url, time.perf_counter() - start_time, file_data is not None and len(file_data) > 0)
 		if file_data is None or len(file_data) == 0:
 			continue
 		
-		# cache file to disk
+		# cache file to disk. Write to temporary file first, so that concurrent readers never see half written file.
 		os.makedirs(os.path.dirname(path_local), exist_ok=True)
-		with open(path_local, "wb") as file:
+		path_local_temporary = path_local + "." + str(threading.get_ident()) + ".part"
+		with open(path_local_temporary, "wb") as file:
 			file.write(file_data)
-			
+		try:
+			os.replace(path_local_temporary, path_local)
+		except PermissionError:
+			# On Windows replacing fails while another thread has the file open. It was downloaded by someone else already, so keep that one.
+			os.remove(path_local_temporary)
+			if not os.path.exists(path_local):
+				raise
+
 		return file_data
 	return
 
+def head_file_in_3rd_repos(path:str) -> None | int:
+	"""
+	Check with HEAD requests if path exists in local repository or in some of MAVEN_REPOS. Nothing is downloaded.
+	Returns:
+		None | int: None if file was not found, otherwise its size or -1 if the mirror didn't tell it.
+	"""
+	path_local = os.path.join(LOCAL_REPOSITORY_DIRECTORY, path)
+	if os.path.exists(path_local):
+		return os.path.getsize(path_local)
+
+	if OFFLINE_MODE:
+		return None
+
+	for maven_repo_url in MAVEN_REPOS:
+		start_time:float = time.perf_counter()
+		with tracer.span("head", url=maven_repo_url + path):
+			try:
+				response = requests.head(maven_repo_url + path, allow_redirects=True)
+				found:bool = response.status_code == 200
+			except requests.exceptions.RequestException as req_err:
+				color_print(Bcolors.FAIL, f"Request error occurred: {req_err}")
+				found = False
+		repository_metrics.record_upstream(maven_repo_url, time.perf_counter() - start_time, found)
+		if found:
+			content_length:str = response.headers.get("Content-Length", "")
+			return int(content_length) if content_length.isdigit() else -1
+	return None
+
+def apply_overrides_to_repository_path(path:str) -> str:
+	"""Apply LIBRARY_OVERRIDE and VERSION_OVERRIDE to a path inside maven repository."""
+
+	for dependency_str, dependency_override_str in LIBRARY_OVERRIDE.items():
+		group_id_and_artifact_id_str, version = dependency_str.split(":")
+		group_id = ".".join(group_id_and_artifact_id_str.split(".")[:-1])
+		artifact_id = group_id_and_artifact_id_str.split(".")[-1]
+
+		override_group_id_and_artifact_id_str, override_version = dependency_override_str.split(":")
+		override_group_id = ".".join(override_group_id_and_artifact_id_str.split(".")[:-1])
+		override_artifact_id = override_group_id_and_artifact_id_str.split(".")[-1]
+
+		dependency_path = group_id.replace(".", "/") + "/" + artifact_id + "/" + version + "/" + artifact_id + "-" + version
+		if dependency_path in path:
+			new_dependency_path = override_group_id.replace(".", "/") + "/" + override_artifact_id + "/" + override_version + "/" + override_artifact_id + "-" + override_version
+			path = path.replace(dependency_path, new_dependency_path)
+			server_log("debug", Bcolors.OKGREEN, f"OVERRIDING library from depency {dependency_str} to {dependency_override_str}")
+
+	for dependency_str, override_version in VERSION_OVERRIDE.items():
+		dependency_groupid_and_artifact, dependency_version = dependency_str.split(":")
+		dependency_path = dependency_groupid_and_artifact.replace(".", "/") + "/" + dependency_version
+		if dependency_path in path:
+			path = path.replace(dependency_version, override_version)
+			server_log("debug", Bcolors.OKGREEN, f"OVERRIDING version from depency {dependency_str} to {override_version}")
+
+	return path
+
+def is_local_dependency_repository_path(repository_path:str) -> bool:
+	"""True if path inside maven repository belongs to a pom that we have source code for."""
+	for identifier in LOCAL_DEPENDENCY_IDENTIFIER_PREFIX:
+		if repository_path.lstrip("/").startswith(identifier.replace(".", "/")):
+			return True
+	return False
+
+class AccessProfileRecorder:
+	"""
+	Records every path that maven requests from the repository server during the build of one target.
+	The profile is saved to ACCESS_PROFILE_DIRECTORY and replayed by warm_up_from_access_profile on the next build of the same target.
+	"""
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.target:None | str = None
+		self.entries:Dict[str, Dict[str, Any]] = {}
+
+	@staticmethod
+	def profile_file_path(target:str) -> str:
+		return os.path.join(ACCESS_PROFILE_DIRECTORY, target.replace(":", "_") + ".json")
+
+	@staticmethod
+	def load_file(profile_file_path:str) -> Tuple[str, Dict[str, Dict[str, Any]]]:
+		"""Returns target and requested path entries of a profile file."""
+		with open(profile_file_path, "r") as f:
+			profile = json.load(f)
+		return profile["target"], profile["paths"]
+
+	@staticmethod
+	def load(target:str) -> Dict[str, Dict[str, Any]]:
+		profile_file_path:str = AccessProfileRecorder.profile_file_path(target)
+		if not os.path.exists(profile_file_path):
+			return {}
+		return AccessProfileRecorder.load_file(profile_file_path)[1]
+
+	def start(self, target:str):
+		"""Start recording requests for target. Previous profile of the target is extended."""
+		with self.lock:
+			self.target = target
+			self.entries = self.load(target)
+
+	def record(self, requested_path:str, served_path:str, hit:bool):
+		with self.lock:
+			if self.target is None:
+				return
+
+			entry:Dict[str, Any] = self.entries.setdefault(requested_path, {"hits": 0, "misses": 0, "override": None})
+			if hit:
+				entry["hits"] += 1
+			else:
+				entry["misses"] += 1
+			if served_path != requested_path:
+				entry["override"] = served_path
+
+	def save(self):
+		with self.lock:
+			if self.target is None:
+				return
+
+			os.makedirs(ACCESS_PROFILE_DIRECTORY, exist_ok=True)
+			with open(self.profile_file_path(self.target), "w") as f:
+				json.dump({"target": self.target, "paths": self.entries}, f, indent=2, sort_keys=True)
+
+access_profile_recorder = AccessProfileRecorder()
+
+class HotFileCache:
+	"""
+	Least recently used in-memory cache for small files of the local repository. Total size of cached files is kept under byte_budget.
+	Cached file is read again when its size or modification time changes.
+	"""
+
+	def __init__(self, byte_budget:int, max_file_size:int):
+		self.lock = threading.Lock()
+		self.byte_budget:int = byte_budget
+		self.max_file_size:int = max_file_size
+		self.size:int = 0
+		self.hits:int = 0
+		self.misses:int = 0
+		# Local file path -> (size, mtime, file data). Most recently used is last.
+		self.file_data_by_local_path:OrderedDict[str, Tuple[int, int, bytes]] = OrderedDict()
+
+	def get(self, file_local_path:str, file_stat:os.stat_result) -> None | bytes:
+		with self.lock:
+			cached = self.file_data_by_local_path.get(file_local_path)
+			if cached is not None and cached[0] == file_stat.st_size and cached[1] == file_stat.st_mtime_ns:
+				self.file_data_by_local_path.move_to_end(file_local_path)
+				self.hits += 1
+				return cached[2]
+
+			self.misses += 1
+			return None
+
+	def put(self, file_local_path:str, file_stat:os.stat_result, file_data:bytes):
+		if len(file_data) > self.max_file_size or len(file_data) > self.byte_budget:
+			return
+
+		with self.lock:
+			old = self.file_data_by_local_path.pop(file_local_path, None)
+			if old is not None:
+				self.size -= len(old[2])
+
+			self.file_data_by_local_path[file_local_path] = (file_stat.st_size, file_stat.st_mtime_ns, file_data)
+			self.size += len(file_data)
+
+			while self.size > self.byte_budget:
+				_, evicted = self.file_data_by_local_path.popitem(last=False)
+				self.size -= len(evicted[2])
+
+	def stats(self) -> Dict[str, int]:
+		with self.lock:
+			return {"hits": self.hits, "misses": self.misses, "files": len(self.file_data_by_local_path), "bytes": self.size, "byte_budget": self.byte_budget}
+
+hot_file_cache = HotFileCache(HOT_FILE_CACHE_BYTE_BUDGET, HOT_FILE_CACHE_MAX_FILE_SIZE)
+
+def read_hot_file(file_local_path:str, file_stat:None | os.stat_result = None) -> bytes:
+	"""Read file through the in-memory hot file cache. Small files are added to the cache."""
+	if file_stat is None:
+		file_stat = os.stat(file_local_path)
+
+	file_data:None | bytes = hot_file_cache.get(file_local_path, file_stat)
+	if file_data is not None:
+		return file_data
+
+	with open(file_local_path, "rb") as file:
+		file_data = file.read()
+
+	hot_file_cache.put(file_local_path, file_stat, file_data)
+	return file_data
+
+# Order of maven version qualifiers. Unknown qualifiers are newer than all of these and are compared alphabetically.
+MAVEN_VERSION_QUALIFIERS:List[str] = ["alpha", "beta", "milestone", "rc", "snapshot", "", "sp"]
+MAVEN_VERSION_QUALIFIER_ALIASES:Dict[str, str] = {"cr": "rc", "ga": "", "final": "", "release": ""}
+MAVEN_VERSION_RELEASE_ITEM = (1, MAVEN_VERSION_QUALIFIERS.index(""), "")
+MAVEN_VERSION_ZERO_ITEM = (2, 0, "")
+
+def maven_version_sort_key(version_str:str) -> Tuple:
+	"""
+	Sort key that orders versions like maven does. Works also for versions that are not numeric, like 1.0.0-v20080225 or 3.5.0.v20090520.
+	Numbers are newer than qualifiers (1.0.1 > 1.0-rc1), trailing zeros are ignored (1.0 == 1.0.0) and known qualifiers are ordered by MAVEN_VERSION_QUALIFIERS.
+	"""
+
+	items:List[Tuple[int, int, str]] = []
+	for token in re.findall(r"\d+|[a-z]+", version_str.lower()):
+		if token.isdigit():
+			items.append((2, int(token), ""))
+			continue
+
+		# Zeros before qualifier don't matter: 1.0-SNAPSHOT == 1-SNAPSHOT
+		while items and items[-1] == MAVEN_VERSION_ZERO_ITEM:
+			items.pop()
+
+		qualifier:str = MAVEN_VERSION_QUALIFIER_ALIASES.get(token, token)
+		if qualifier in MAVEN_VERSION_QUALIFIERS:
+			items.append((1, MAVEN_VERSION_QUALIFIERS.index(qualifier), ""))
+		else:
+			items.append((1, len(MAVEN_VERSION_QUALIFIERS), qualifier))
+
+	while items and items[-1] in (MAVEN_VERSION_ZERO_ITEM, MAVEN_VERSION_RELEASE_ITEM):
+		items.pop()
+
+	# Shorter version is compared against release qualifier: 1-alpha < 1 < 1.1
+	items.append(MAVEN_VERSION_RELEASE_ITEM)
+	return tuple(items)
+
+class MavenMetadataCache:
+	"""
+	Generated maven-metadata.xml by artifact directory. Cached metadata is used as long as modification times of the artifact directory
+	and its version directories stay the same.
+	"""
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.metadata_by_directory:Dict[str, Tuple[Tuple, bytes]] = {}
+
+	@staticmethod
+	def directory_signature(artifact_directory:str) -> Tuple:
+		signature:List[Tuple[str, float]] = [("", os.stat(artifact_directory).st_mtime)]
+		with os.scandir(artifact_directory) as entries:
+			for entry in entries:
+				if entry.is_dir():
+					signature.append((entry.name, entry.stat().st_mtime))
+		return tuple(sorted(signature))
+
+	def get(self, artifact_directory:str, signature:Tuple) -> None | bytes:
+		with self.lock:
+			cached = self.metadata_by_directory.get(artifact_directory)
+		if cached is None or cached[0] != signature:
+			return None
+		return cached[1]
+
+	def put(self, artifact_directory:str, signature:Tuple, xml_bytes:bytes):
+		with self.lock:
+			self.metadata_by_directory[artifact_directory] = (signature, xml_bytes)
+
+maven_metadata_cache = MavenMetadataCache()
+
+# Checksum sidecars that the repository server can compute for files in the local repository.
+CHECKSUM_ALGORITHMS:List[str] = ["sha1", "md5"]
+
+def create_etag(file_stat:os.stat_result) -> str:
+	return "\"" + format(file_stat.st_size, "x") + "-" + format(file_stat.st_mtime_ns, "x") + "\""
+
+class ChecksumSidecarCache:
+	"""Checksums of local repository files. Checksum is computed again when size or modification time of the file changes."""
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.checksum_by_file:Dict[Tuple[str, str], Tuple[int, int, str]] = {}
+
+	def get(self, file_local_path:str, algorithm:str) -> str:
+		file_stat = os.stat(file_local_path)
+
+		with self.lock:
+			cached = self.checksum_by_file.get((file_local_path, algorithm))
+		if cached is not None and cached[0] == file_stat.st_size and cached[1] == file_stat.st_mtime_ns:
+			return cached[2]
+
+		checksum = hashlib.new(algorithm)
+		with open(file_local_path, "rb") as f:
+			while True:
+				chunk = f.read(65536)
+				if not chunk:
+					break
+				checksum.update(chunk)
+
+		with self.lock:
+			self.checksum_by_file[(file_local_path, algorithm)] = (file_stat.st_size, file_stat.st_mtime_ns, checksum.hexdigest())
+		return checksum.hexdigest()
+
+checksum_sidecar_cache = ChecksumSidecarCache()
+
 class RepositoryRequestHandler(SimpleHTTPRequestHandler):
+	trace_span = NO_SPAN
+	response_bytes = 0
+
 	def extract_group_and_artifact(self, path:str) -> Tuple[str, str]:
 		"""Extract groupId and artifactId from the folder path."""
 		parts = path.strip("/").split("/")
@@ -158,81 +758,174 @@ class RepositoryRequestHandler(SimpleHTTPRequestHandler):
 		for subdir in os.listdir(dir):
 			if glob.glob(os.path.join(dir, subdir) + "/*.pom"):
 				versions.append(subdir)
-		return sorted(versions, key=lambda v: list(map(int, v.split('.'))))
+		return sorted(versions, key=maven_version_sort_key)
 
 	def generate_maven_metadata(self, path:str) -> bytes:
 		path_inside_local_repo:str = os.path.dirname(path)[1:]
-		print("jddjdjd:", path_inside_local_repo)
+		artifact_directory:str = os.path.join(LOCAL_REPOSITORY_DIRECTORY, path_inside_local_repo)
+		artifact_directory_signature = maven_metadata_cache.directory_signature(artifact_directory)
+
+		cached_xml_bytes:None | bytes = maven_metadata_cache.get(artifact_directory, artifact_directory_signature)
+		if cached_xml_bytes is not None:
+			return cached_xml_bytes
+
 		group_id, artifact_id = self.extract_group_and_artifact(path_inside_local_repo)
 		versions = self.extract_versions(path_inside_local_repo)
 		
 		if not versions:
-			print("No version folders found in the given directory.")
+			server_log("debug", Bcolors.WARNING, "No version folders found in the given directory.")
+			maven_metadata_cache.put(artifact_directory, artifact_directory_signature, b"")
 			return b""
+
+		release_versions:List[str] = [version for version in versions if not version.upper().endswith("SNAPSHOT")]
 		
 		# Create XML structure
 		metadata = ET.Element("metadata")
 		ET.SubElement(metadata, "groupId").text = group_id
 		ET.SubElement(metadata, "artifactId").text = artifact_id
 		versioning = ET.SubElement(metadata, "versioning")
+		ET.SubElement(versioning, "latest").text = versions[-1]
+		if release_versions:
+			ET.SubElement(versioning, "release").text = release_versions[-1]
 		versions_elem = ET.SubElement(versioning, "versions")
 		
 		for version in versions:
 			ET.SubElement(versions_elem, "version").text = version
 		
-		ET.SubElement(versioning, "lastUpdated").text = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+		# Use modification time of the newest version folder, so that the metadata stays same as long as the directory doesn't change.
+		last_updated:float = max(mtime for _, mtime in artifact_directory_signature)
+		ET.SubElement(versioning, "lastUpdated").text = datetime.utcfromtimestamp(last_updated).strftime("%Y%m%d%H%M%S")
 		
 		xml_bytes = ET.tostring(metadata, encoding="utf-8", xml_declaration=True)
-		print("xml_bytes:", xml_bytes)
+		server_log("debug", Bcolors.ENDC, "xml_bytes: " + str(xml_bytes))
+		maven_metadata_cache.put(artifact_directory, artifact_directory_signature, xml_bytes)
 		return xml_bytes
 
-	def do_GET(self):
-		path = self.path
-		print()
-		print()
-		color_print(Bcolors.OKGREEN, "MAVEN WANTS FILE: " + path)
-		color_print(Bcolors.OKGREEN, "MAVEN WANTS FILE: ", end="")
-		print(path)
-		print()
-
-		for dependency_str, dependency_override_str in LIBRARY_OVERRIDE.items():
-			group_id_and_artifact_id_str, version = dependency_str.split(":")
-			group_id = ".".join(group_id_and_artifact_id_str.split(".")[:-1])
-			artifact_id = group_id_and_artifact_id_str.split(".")[-1]
-
-			override_group_id_and_artifact_id_str, override_version = dependency_override_str.split(":")
-			override_group_id = ".".join(override_group_id_and_artifact_id_str.split(".")[:-1])
-			override_artifact_id = override_group_id_and_artifact_id_str.split(".")[-1]
+	def is_not_modified(self, etag:str, mtime:float) -> bool:
+		"""Check If-None-Match and If-Modified-Since headers of the request."""
+		if_none_match:None | str = self.headers.get("If-None-Match")
+		if if_none_match is not None:
+			return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+
+		if_modified_since:None | str = self.headers.get("If-Modified-Since")
+		if if_modified_since is not None:
+			try:
+				return int(mtime) <= email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+			except (TypeError, ValueError):
+				return False
 
-			dependency_path = group_id.replace(".", "/") + "/" + artifact_id + "/" + version + "/" + artifact_id + "-" + version
-			if dependency_path in path:
-				new_dependency_path = override_group_id.replace(".", "/") + "/" + override_artifact_id + "/" + override_version + "/" + override_artifact_id + "-" + override_version
-				path = path.replace(dependency_path, new_dependency_path)
-				color_print(Bcolors.OKGREEN, f"OVERRIDING library from depency {dependency_str} to {dependency_override_str}")
+		return False
 
-		for dependency_str, override_version in VERSION_OVERRIDE.items():
-			dependency_groupid_and_artifact, dependency_version = dependency_str.split(":")
-			dependency_path = dependency_groupid_and_artifact.replace(".", "/") + "/" + dependency_version
-			if dependency_path in path:
-				path = path.replace(dependency_version, override_version)
-				color_print(Bcolors.OKGREEN, f"OVERRIDING version from depency {dependency_str} to {override_version}")
+	def send_headers(self, content_length:None | int, validator:None | os.stat_result = None) -> bool:
+		"""
+		Send 200 response headers. If validator is given, ETag and Last-Modified are sent and 304 is sent if client already has the data.
+		Returns:
+			bool: False if 304 was sent and no body should follow.
+		"""
+		if validator is not None:
+			etag:str = create_etag(validator)
+			if self.is_not_modified(etag, validator.st_mtime):
+				self.send_response(304)
+				self.send_header("ETag", etag)
+				self.end_headers()
+				return False
+
+		self.send_response(200)
+		self.send_header("Content-type", "text/plain")
+		if content_length is not None:
+			self.send_header("Content-Length", str(content_length))
+		if validator is not None:
+			self.send_header("ETag", etag)
+			self.send_header("Last-Modified", email.utils.formatdate(validator.st_mtime, usegmt=True))
+		self.end_headers()
+		return True
+
+	def send_data(self, file_data:bytes, send_body:bool, validator:None | os.stat_result = None):
+		"""Send 200 response with file_data. If validator is given, ETag and Last-Modified are sent and 304 is sent if client already has the data."""
+		if not self.send_headers(len(file_data), validator):
+			return
+
+		if send_body:
+			self.wfile.write(file_data)
+			self.trace_span.add_bytes(len(file_data))
+			self.response_bytes += len(file_data)
+
+	def send_local_file(self, file_local_path:str, send_body:bool):
+		"""Send file from local repository. HEAD requests and 304 responses don't read the file."""
+		file_stat = os.stat(file_local_path)
+		etag:str = create_etag(file_stat)
+		if self.is_not_modified(etag, file_stat.st_mtime):
+			self.send_response(304)
+			self.send_header("ETag", etag)
+			self.end_headers()
+			return
+
+		self.send_response(200)
+		self.send_header("Content-type", "text/plain")
+		self.send_header("Content-Length", str(file_stat.st_size))
+		self.send_header("ETag", etag)
+		self.send_header("Last-Modified", email.utils.formatdate(file_stat.st_mtime, usegmt=True))
+		self.end_headers()
+		if not send_body:
+			return
+
+		self.trace_span.add_bytes(file_stat.st_size)
+		self.response_bytes += file_stat.st_size
+		if file_stat.st_size > HOT_FILE_CACHE_MAX_FILE_SIZE:
+			with open(file_local_path, "rb") as file:
+				shutil.copyfileobj(file, self.wfile)
+			return
+
+		self.wfile.write(read_hot_file(file_local_path, file_stat))
+
+	def log_message(self, format, *args):
+		# Default access log of http.server. Replaced by the one line per request that serve_repository_request logs.
+		server_log("debug", Bcolors.ENDC, "%s - - [%s] %s" % (self.address_string(), self.log_date_time_string(), format % args))
+
+	def send_metrics(self, send_body:bool):
+		self.send_data(json.dumps(repository_metrics.snapshot(), indent=2).encode("utf-8"), send_body)
+
+	def handle_repository_request(self, send_body:bool):
+		path = self.path
+		server_log("debug", Bcolors.OKGREEN, "\n\nMAVEN WANTS FILE: " + path + "\n")
+
+		path = apply_overrides_to_repository_path(path)
+		overridden:bool = path != self.path
 
 		file_local_path:str = os.path.join(LOCAL_REPOSITORY_DIRECTORY, path.replace("/", "\\")[1:])
-		print("file_local_path: ", file_local_path)
+		server_log("debug", Bcolors.ENDC, "file_local_path: " + file_local_path)
 		if os.path.exists(file_local_path):
-			# Open the file in binary mode
-			with open(file_local_path, 'rb') as file:
-				# Read all bytes from the file
-				file_data = file.read()
-
-				self.send_response(200)
-				self.send_header("Content-type", "text/plain")
-				self.send_header("Content-Length", str(len(file_data)))
-				self.end_headers()
-				self.wfile.write(file_data)
+			self.request_outcome = "override" if overridden else "local_hit"
+			self.send_local_file(file_local_path, send_body)
+			access_profile_recorder.record(self.path, path, True)
 			return
 
+		# Checksums of local artifacts and generated metadata are computed here, because they don't exist in the local repository.
+		checksum_algorithm:str = os.path.splitext(path)[1][1:]
+		if checksum_algorithm in CHECKSUM_ALGORITHMS:
+			checksummed_path:str = path[:-len(checksum_algorithm) - 1]
+			checksummed_local_path:str = file_local_path[:-len(checksum_algorithm) - 1]
+
+			if os.path.exists(checksummed_local_path):
+				self.request_outcome = "checksum"
+				if not send_body:
+					# Length of hex checksum is known without reading the artifact.
+					self.send_headers(hashlib.new(checksum_algorithm).digest_size * 2, os.stat(checksummed_local_path))
+					access_profile_recorder.record(self.path, path, True)
+					return
+				self.send_data(checksum_sidecar_cache.get(checksummed_local_path, checksum_algorithm).encode("ascii"), send_body, os.stat(checksummed_local_path))
+				access_profile_recorder.record(self.path, path, True)
+				return
+
+			if os.path.basename(checksummed_path) == "maven-metadata.xml" and os.path.exists(os.path.dirname(file_local_path)):
+				metadata = self.generate_maven_metadata(checksummed_path)
+				if metadata != b"":
+					self.request_outcome = "checksum"
+					self.send_data(hashlib.new(checksum_algorithm, metadata).hexdigest().encode("ascii"), send_body)
+					return
+
 		if os.path.basename(path) == "maven-metadata.xml" and os.path.exists(os.path.dirname(file_local_path)):
+			self.request_outcome = "metadata"
 			file_data = self.generate_maven_metadata(path)
 
 			if file_data == b"":
@@ -240,31 +933,67 @@ class RepositoryRequestHandler(SimpleHTTPRequestHandler):
 				self.end_headers()
 				return
 
-			self.send_response(200)
-			self.send_header("Content-type", "text/plain")
-			self.send_header("Content-Length", str(len(file_data)))
-			self.end_headers()
-			self.wfile.write(file_data)
+			self.send_data(file_data, send_body)
 			return
 			
-		for identifier in LOCAL_DEPENDENCY_IDENTIFIER_PREFIX:
-			identifier = identifier.replace(".", "/")
-			if path.startswith(identifier):
-				self.send_response(404)
-				self.end_headers()
+		if is_local_dependency_repository_path(path):
+			self.request_outcome = "local_prefix_404"
+			self.send_response(404)
+			self.end_headers()
+			access_profile_recorder.record(self.path, path, False)
+			return
+
+		if not send_body:
+			# Existence check. Ask the mirrors with HEAD instead of downloading the file.
+			content_length:None | int = head_file_in_3rd_repos(path[1:])
+			if content_length is not None:
+				self.request_outcome = "override" if overridden else "upstream_hit"
+				self.send_headers(content_length if content_length >= 0 else None)
 				return
 
-		file_data = download_file_from_3rd_repos(path)
-		if not file_data is None:
-			self.send_response(200)
-			self.send_header("Content-type", "text/plain")
-			self.send_header("Content-Length", str(len(file_data)))
+			self.request_outcome = "upstream_miss"
+			self.send_response(404)
 			self.end_headers()
-			self.wfile.write(file_data)
+			return
+
+		file_data = download_file_from_3rd_repos(path[1:])
+		if not file_data is None:
+			self.request_outcome = "override" if overridden else "upstream_hit"
+			self.send_data(file_data, send_body)
+			access_profile_recorder.record(self.path, path, True)
 			return
 			
+		self.request_outcome = "upstream_miss"
 		self.send_response(404)
 		self.end_headers()
+		access_profile_recorder.record(self.path, path, False)
+
+	def send_response(self, code, message=None):
+		self.response_status = code
+		super().send_response(code, message)
+
+	def serve_repository_request(self, send_body:bool):
+		if self.path == METRICS_PATH:
+			self.send_metrics(send_body)
+			return
+
+		self.request_outcome:str = "upstream_miss"
+		self.response_status:int = 0
+		self.response_bytes:int = 0
+		start_time:float = time.perf_counter()
+
+		with tracer.span("repository_request", path=self.path, method=self.command) as self.trace_span:
+			self.handle_repository_request(send_body)
+
+		duration:float = time.perf_counter() - start_time
+		repository_metrics.record_request(self.request_outcome, duration, self.response_bytes)
+		server_log("info", Bcolors.OKGREEN if self.response_status < 400 else Bcolors.WARNING, f"{self.command} {self.path} {self.response_status} {self.request_outcome} {duration * 1000:.1f} ms {self.response_bytes} B")
+
+	def do_GET(self):
+		self.serve_repository_request(True)
+
+	def do_HEAD(self):
+		self.serve_repository_request(False)
 
 
 def create_pom_signature(group_id:str, artifact_id:str, version:str) -> str:
@@ -299,6 +1028,10 @@ class FileHashManager:
 
 		print("computing hashes for ", directory)
 
+		with tracer.span("hash_directory", directory=directory) as span:
+			return self._compute_hashes_of_files(directory, span)
+
+	def _compute_hashes_of_files(self, directory:str, span) -> Dict[str, str]:
 		hashes = {}
 		for root, dirs, files in os.walk(directory):
 			if os.path.basename(root) in self.IGNORE_SUB_FOLDERS:
@@ -318,6 +1051,7 @@ class FileHashManager:
 							if not chunk:
 								break
 							sha256.update(chunk)
+							span.add_bytes(len(chunk))
 
 					hashes[rel_path] = sha256.hexdigest()
 				except Exception as e:
@@ -329,6 +1063,7 @@ class FileHashManager:
 
 		self.hashes_by_directory[filename] = hashes
 
+		os.makedirs(os.path.dirname(filename), exist_ok=True)
 		with open(filename, "w") as f:
 			json.dump(hashes, f, indent=2)
 
@@ -343,13 +1078,24 @@ class FileHashManager:
 		with open(filename, "r") as f:
 			return json.load(f)
 
+	def _hash_file_path(self, directory:str) -> str:
+		return ".\\.hash_files\\" + directory.replace("\\", ".").replace("..", ".").replace(":", "") + ".json"
+
+	def forget_directory(self, directory:str):
+		"""Remove saved hashes of directory, so that the next files_changed_in_directory reports it as changed."""
+
+		hash_file_path:str = self._hash_file_path(directory)
+		self.hashes_by_directory.pop(hash_file_path, None)
+		if os.path.exists(hash_file_path):
+			os.remove(hash_file_path)
+
 	def files_changed_in_directory(self, directory:str) -> bool:
 		"""
 		Check for changes in directory files compared to saved hashes.
 		Returns a dictionary with changes and updates the hash file.
 		"""
 
-		hash_file_path = ".\\.hash_files\\" + directory.replace("\\", ".").replace("..", ".").replace(":", "") + ".json"
+		hash_file_path:str = self._hash_file_path(directory)
 
 		# Load previous hashes
 		old_hashes = self._load_hashes(hash_file_path)
@@ -380,6 +1126,7 @@ class FileHashManager:
 
 file_hash_manager = FileHashManager()
 
+@traced("parse_xml")
 def parse_xml_without_namespace(path:str) -> None | ET.Element:
 	try:
 		it = ET.iterparse(path)
@@ -419,6 +1166,7 @@ def create_pom_info(group_id_:str, artifact_id_:str, version_:str, pom_dir_by_po
 
 	return PomInfo(group_id_, artifact_id_, version_, pom_path, False)
 
+@traced("map_pom_dependencies")
 def map_pom_dependencies(pom_info:PomInfo, pom_dir_by_pom_signature:Dict[str, str], pom_info_by_pom_signature:Dict[str, PomInfo] | None = None) -> Dict[str, PomInfo]:
 
 	def is_3rd_dependecy(dependency:PomInfo) -> bool:
@@ -607,6 +1355,7 @@ def map_pom_dependencies(pom_info:PomInfo, pom_dir_by_pom_signature:Dict[str, st
 	
 	return pom_info_by_pom_signature
 
+@traced("map_pom_paths")
 def map_pom_paths(path:str) -> Dict[str, str]:
 	pom_dir_by_pom_signature:Dict[str, str] = {}
 
@@ -646,6 +1395,423 @@ def map_pom_paths(path:str) -> Dict[str, str]:
 
 	return pom_dir_by_pom_signature
 
+def create_repository_path(group_id:str, artifact_id:str, version:str, extension:str) -> str:
+	"""Path of artifact file inside maven repository. For example org/eclipse/osgi/3.5.2/osgi-3.5.2.jar"""
+	return group_id.replace(".", "/") + "/" + artifact_id + "/" + version + "/" + artifact_id + "-" + version + "." + extension
+
+# Dependencies with these scopes are not needed by the modules that depend on the pom, so maven doesn't fetch them.
+NON_TRANSITIVE_SCOPES:List[str] = ["test", "provided", "system"]
+
+def resolve_pom_text(text:None | str, properties:Dict[str, str]) -> str:
+	"""Stripped text of pom element with ${...} properties replaced. Unknown properties are left as they are."""
+	if text is None:
+		return ""
+	return re.sub(r"\$\{([^}]+)\}", lambda match: properties.get(match.group(1), match.group(0)), text.strip())
+
+class Pom3rdDependency:
+	"""Dependency declaration as maven sees it in a pom, before LIBRARY_OVERRIDE and VERSION_OVERRIDE. Exclusions are (groupId, artifactId) pairs, "*" matches anything."""
+
+	def __init__(self, group_id:str, artifact_id:str, version:str, exclusions:List[Tuple[str, str]]):
+		self.group_id:str = group_id
+		self.artifact_id:str = artifact_id
+		self.version:str = version
+		self.exclusions:List[Tuple[str, str]] = exclusions
+
+	def pom_repository_path(self) -> str:
+		return apply_overrides_to_repository_path(create_repository_path(self.group_id, self.artifact_id, self.version, "pom"))
+
+	def is_excluded_by(self, exclusions:List[Tuple[str, str]]) -> bool:
+		for excluded_group_id, excluded_artifact_id in exclusions:
+			if excluded_group_id in ["*", self.group_id] and excluded_artifact_id in ["*", self.artifact_id]:
+				return True
+		return False
+
+def read_pom_dependency(dependency_element:ET.Element, properties:Dict[str, str], managed_versions:Dict[Tuple[str, str], str]) -> None | Pom3rdDependency:
+	"""
+	Read dependency element of pom. Version comes from dependencyManagement if the element has none.
+	Returns:
+		None | Pom3rdDependency: None if maven has to resolve the dependency itself (unresolved property, version range) or if it is built locally.
+	"""
+
+	group_id:str = re.sub(r"\s+", "", resolve_pom_text(try_read_element_text(dependency_element.find("groupId")), properties))
+	artifact_id:str = re.sub(r"\s+", "", resolve_pom_text(try_read_element_text(dependency_element.find("artifactId")), properties))
+	version_:str = resolve_pom_text(try_read_element_text(dependency_element.find("version")), properties) or managed_versions.get((group_id, artifact_id), "")
+
+	if group_id == "" or artifact_id == "" or version_ == "" or "${" in group_id + artifact_id + version_ or version_[0] in "[(":
+		return None
+	if is_local_dependency_repository_path(group_id.replace(".", "/")):
+		return None
+
+	exclusions:List[Tuple[str, str]] = []
+	for exclusion_element in dependency_element.findall("exclusions/exclusion"):
+		exclusions.append((resolve_pom_text(try_read_element_text(exclusion_element.find("groupId")), properties) or "*", resolve_pom_text(try_read_element_text(exclusion_element.find("artifactId")), properties) or "*"))
+
+	return Pom3rdDependency(group_id, artifact_id, version_, exclusions)
+
+class Pom3rdModel:
+	"""Parts of 3rd party pom that are needed for finding its transitive dependencies. Properties and dependencyManagement include the ones inherited from parents and imported boms."""
+
+	def __init__(self, packaging:str, parent_repository_path:None | str):
+		self.packaging:str = packaging
+		self.parent_repository_path:None | str = parent_repository_path
+		self.properties:Dict[str, str] = {}
+		self.managed_versions:Dict[Tuple[str, str], str] = {}
+		self.dependencies:List[Pom3rdDependency] = []
+
+def is_in_local_repository(repository_path:str) -> bool:
+	return os.path.exists(os.path.join(LOCAL_REPOSITORY_DIRECTORY, repository_path))
+
+def fetch_3rd_file(repository_path:str) -> bool:
+	"""Make sure that file exists in LOCAL_REPOSITORY_DIRECTORY. Returns False if it is missing and can't be downloaded."""
+	if is_in_local_repository(repository_path):
+		return True
+	return download_file_from_3rd_repos(repository_path) is not None
+
+class Pom3rdResolver:
+	"""
+	Fetches 3rd party poms and artifacts that maven 2 would resolve for the local modules.
+	Every path is downloaded only once, even if several workers need it at the same time (shared parents and boms).
+	"""
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.fetch_locks:Dict[str, threading.Lock] = {}
+		self.fetched:Dict[str, bool] = {}
+		self.models:Dict[str, None | Pom3rdModel] = {}
+		self.missing_repository_paths:List[str] = []
+		self.resolved_count:int = 0
+
+	def add_missing(self, repository_path:str):
+		with self.lock:
+			if repository_path not in self.missing_repository_paths:
+				self.missing_repository_paths.append(repository_path)
+
+	def fetch(self, repository_path:str) -> bool:
+		"""Same as fetch_3rd_file, but workers asking for a path that is being downloaded wait for that download."""
+
+		with self.lock:
+			if repository_path in self.fetched:
+				return self.fetched[repository_path]
+			fetch_lock:threading.Lock = self.fetch_locks.setdefault(repository_path, threading.Lock())
+
+		with fetch_lock:
+			with self.lock:
+				if repository_path in self.fetched:
+					return self.fetched[repository_path]
+
+			try:
+				fetched:bool = fetch_3rd_file(repository_path)
+			except OSError as e:
+				color_print(Bcolors.FAIL, "Failed to fetch " + repository_path + ": " + str(e))
+				fetched = False
+
+			with self.lock:
+				self.fetched[repository_path] = fetched
+
+		if not fetched:
+			self.add_missing(repository_path)
+		return fetched
+
+	def read_model(self, pom_repository_path:str, children:Tuple[str, ...] = ()) -> None | Pom3rdModel:
+		"""
+		Fetch 3rd party pom, its parents and the boms it imports, and read them. Models are cached, so every pom is read only once (or twice if two threads read it at the same time).
+		Returns:
+			None | Pom3rdModel: None if pom, some of its parents or imported boms is missing.
+		"""
+
+		with self.lock:
+			if pom_repository_path in self.models:
+				return self.models[pom_repository_path]
+
+		if pom_repository_path in children:
+			color_print(Bcolors.FAIL, "Parent or import cycle: " + " -> ".join(children + (pom_repository_path,)))
+			self.add_missing(pom_repository_path)
+			return None
+
+		model:None | Pom3rdModel = None
+		root = parse_xml_without_namespace(os.path.join(LOCAL_REPOSITORY_DIRECTORY, pom_repository_path)) if self.fetch(pom_repository_path) else None
+		if root is None:
+			self.add_missing(pom_repository_path)
+		else:
+			model = self._read_model(root, children + (pom_repository_path,))
+
+		with self.lock:
+			self.models[pom_repository_path] = model
+		return model
+
+	def _read_model(self, root:ET.Element, children:Tuple[str, ...]) -> None | Pom3rdModel:
+		parent_model:None | Pom3rdModel = None
+		parent_repository_path:None | str = None
+		parent_element = root.find("parent")
+		parent_version:str = ""
+		parent_group_id:str = ""
+		if parent_element is not None:
+			parent_group_id = resolve_pom_text(try_read_element_text(parent_element.find("groupId")), {})
+			parent_version = resolve_pom_text(try_read_element_text(parent_element.find("version")), {})
+			parent_repository_path = apply_overrides_to_repository_path(create_repository_path(parent_group_id, resolve_pom_text(try_read_element_text(parent_element.find("artifactId")), {}), parent_version, "pom"))
+			parent_model = self.read_model(parent_repository_path, children)
+			if parent_model is None:
+				return None
+
+		model = Pom3rdModel(resolve_pom_text(try_read_element_text(root.find("packaging")), {}) or "jar", parent_repository_path)
+		if parent_model is not None:
+			model.properties.update(parent_model.properties)
+			model.managed_versions.update(parent_model.managed_versions)
+
+		group_id:str = resolve_pom_text(try_read_element_text(root.find("groupId")), {}) or parent_group_id
+		version_:str = resolve_pom_text(try_read_element_text(root.find("version")), {}) or parent_version
+		model.properties.update({"project.groupId": group_id, "pom.groupId": group_id, "project.version": version_, "pom.version": version_, "version": version_, "project.parent.version": parent_version})
+		properties_element = root.find("properties")
+		if properties_element is not None:
+			for property_element in properties_element:
+				model.properties[property_element.tag] = (property_element.text or "").strip()
+
+		# Boms are imported after inheritance, so versions managed by the pom itself or its parents win over imported ones.
+		imported_bom_repository_paths:List[str] = []
+		for dependency_element in root.findall("dependencyManagement/dependencies/dependency"):
+			managed_group_id:str = resolve_pom_text(try_read_element_text(dependency_element.find("groupId")), model.properties)
+			managed_artifact_id:str = resolve_pom_text(try_read_element_text(dependency_element.find("artifactId")), model.properties)
+			managed_version:str = resolve_pom_text(try_read_element_text(dependency_element.find("version")), model.properties)
+			if managed_version == "":
+				continue
+			if resolve_pom_text(try_read_element_text(dependency_element.find("scope")), model.properties) == "import":
+				imported_bom_repository_paths.append(apply_overrides_to_repository_path(create_repository_path(managed_group_id, managed_artifact_id, managed_version, "pom")))
+				continue
+			model.managed_versions[(managed_group_id, managed_artifact_id)] = managed_version
+
+		for imported_bom_repository_path in imported_bom_repository_paths:
+			bom_model:None | Pom3rdModel = self.read_model(imported_bom_repository_path, children)
+			if bom_model is None:
+				return None
+			for key, managed_version in bom_model.managed_versions.items():
+				model.managed_versions.setdefault(key, managed_version)
+
+		for dependency_element in root.findall("dependencies/dependency"):
+			if resolve_pom_text(try_read_element_text(dependency_element.find("scope")), model.properties) in NON_TRANSITIVE_SCOPES:
+				continue
+			if resolve_pom_text(try_read_element_text(dependency_element.find("optional")), model.properties) == "true":
+				continue
+
+			dependency:None | Pom3rdDependency = read_pom_dependency(dependency_element, model.properties, model.managed_versions)
+			if dependency is not None:
+				model.dependencies.append(dependency)
+
+		return model
+
+	def fetch_dependency(self, dependency:Pom3rdDependency) -> None | Pom3rdModel:
+		"""Fetch pom of dependency with its parents and imported boms, and the artifact file next to the pom."""
+
+		pom_repository_path:str = dependency.pom_repository_path()
+		model:None | Pom3rdModel = self.read_model(pom_repository_path)
+		if model is None:
+			return None
+
+		extension:None | str = ARTIFACT_EXTENSION_BY_PACKAGING.get(model.packaging, model.packaging)
+		if extension is not None:
+			self.fetch(pom_repository_path[:-len("pom")] + extension)
+		return model
+
+	def resolve_tree(self, executor:ThreadPoolExecutor, roots:List[Pom3rdDependency], managed_versions:Dict[Tuple[str, str], str]):
+		"""
+		Walk dependency tree of roots level by level like maven 2 does. Poms of one level are fetched concurrently.
+		Nearest declaration of groupId:artifactId wins (first one on the same level) and losers are not fetched. Exclusions apply to the whole subtree below the dependency that declares them.
+		managed_versions are the dependencyManagement of the local pom, they override versions of transitive dependencies.
+		"""
+
+		resolved_keys:set = set()
+		level:List[Pom3rdDependency] = roots
+		while level:
+			winners:List[Pom3rdDependency] = []
+			for dependency in level:
+				key:Tuple[str, str] = (dependency.group_id, dependency.artifact_id)
+				if key in resolved_keys:
+					continue
+				resolved_keys.add(key)
+				winners.append(dependency)
+
+			futures = [executor.submit(self.fetch_dependency, dependency) for dependency in winners]
+			next_level:List[Pom3rdDependency] = []
+			for dependency, future in zip(winners, futures):
+				pom_repository_path:str = dependency.pom_repository_path()
+				try:
+					model:None | Pom3rdModel = future.result()
+				except Exception as e:
+					color_print(Bcolors.FAIL, "Failed to prefetch " + pom_repository_path + ": " + type(e).__name__ + ": " + str(e))
+					self.add_missing(pom_repository_path)
+					model = None
+
+				self.resolved_count += 1
+				progress:str = "[" + str(self.resolved_count) + "] " + pom_repository_path
+				if model is None:
+					color_print(Bcolors.FAIL, progress + " missing")
+					continue
+				color_print(Bcolors.OKGREEN, progress)
+
+				for child in model.dependencies:
+					if child.is_excluded_by(dependency.exclusions):
+						continue
+					child_version:str = managed_versions.get((child.group_id, child.artifact_id), child.version)
+					next_level.append(Pom3rdDependency(child.group_id, child.artifact_id, child_version, dependency.exclusions + child.exclusions))
+
+			level = next_level
+
+def read_local_3rd_roots(pom_info:PomInfo) -> List[Tuple[List[Pom3rdDependency], Dict[Tuple[str, str], str]]]:
+	"""
+	3rd party dependencies of local pom grouped into trees that maven resolves separately: project dependencies, parent, every plugin and extension, and every imported bom.
+	Each tree comes with the dependencyManagement versions that apply to it. Entries that are only in dependencyManagement are not fetched by maven, so they are left out.
+	"""
+
+	if pom_info.is_3rd or pom_info.path == "":
+		return []
+
+	pom_file_path:str = os.path.join(pom_info.path, "pom.xml")
+	if not os.path.isfile(pom_file_path):
+		return []
+	root = parse_xml_without_namespace(pom_file_path)
+	if root is None:
+		return []
+
+	properties:Dict[str, str] = {"project.groupId": pom_info.group_id, "pom.groupId": pom_info.group_id, "project.version": pom_info.version, "pom.version": pom_info.version, "version": pom_info.version}
+	properties_element = root.find("properties")
+	if properties_element is not None:
+		for property_element in properties_element:
+			properties[property_element.tag] = (property_element.text or "").strip()
+
+	trees:List[Tuple[List[Pom3rdDependency], Dict[Tuple[str, str], str]]] = []
+	managed_versions:Dict[Tuple[str, str], str] = {}
+	for dependency_element in root.findall("dependencyManagement/dependencies/dependency"):
+		dependency:None | Pom3rdDependency = read_pom_dependency(dependency_element, properties, {})
+		if dependency is None:
+			continue
+		if resolve_pom_text(try_read_element_text(dependency_element.find("scope")), properties) == "import":
+			trees.append(([dependency], {}))
+			continue
+		managed_versions[(dependency.group_id, dependency.artifact_id)] = dependency.version
+
+	project_dependencies:List[Pom3rdDependency] = []
+	for dependency_element in root.findall("dependencies/dependency"):
+		dependency = read_pom_dependency(dependency_element, properties, managed_versions)
+		if dependency is not None:
+			project_dependencies.append(dependency)
+	if project_dependencies:
+		trees.append((project_dependencies, managed_versions))
+
+	for element in root.findall(".//build/plugins/plugin") + root.findall(".//build/extensions/extension") + root.findall("parent"):
+		dependency = read_pom_dependency(element, properties, {})
+		if dependency is not None:
+			trees.append(([dependency], {}))
+
+	return trees
+
+@traced("prefetch_3rd_artifacts")
+def prefetch_3rd_artifacts(pom_info_by_pom_signature:Dict[str, PomInfo]) -> bool:
+	"""
+	Downloads all missing 3rd party poms and artifacts of the local modules concurrently before any maven is launched.
+	Parents, imported boms and transitive dependencies are followed with maven's exclusions and nearest wins mediation, so only paths that maven will request are fetched.
+	When OFFLINE_MODE is true, only checks that everything exists in the local repository.
+	Returns:
+		bool: True if every 3rd party artifact is available locally, False if not.
+	"""
+
+	trees:List[Tuple[List[Pom3rdDependency], Dict[Tuple[str, str], str]]] = []
+	for pom_info in pom_info_by_pom_signature.values():
+		trees += read_local_3rd_roots(pom_info)
+	if not trees:
+		return True
+
+	box_print("Prefetching 3rd party dependencies of " + str(len([pom_info for pom_info in pom_info_by_pom_signature.values() if not pom_info.is_3rd])) + " modules" + (" (offline)" if OFFLINE_MODE else ""))
+
+	resolver = Pom3rdResolver()
+	with ThreadPoolExecutor(max_workers=PREFETCH_WORKER_COUNT) as executor:
+		for roots, managed_versions in trees:
+			resolver.resolve_tree(executor, roots, managed_versions)
+
+	if resolver.missing_repository_paths:
+		missing_repository_paths:List[str] = sorted(resolver.missing_repository_paths)
+		color_print(Bcolors.FAIL, "Missing 3rd party artifacts: " + str(len(missing_repository_paths)))
+		for missing_repository_path in missing_repository_paths:
+			color_print(Bcolors.FAIL, "  " + missing_repository_path)
+		return False
+
+	color_print(Bcolors.OKGREEN, "All " + str(len(resolver.fetched)) + " 3rd party poms and artifacts are available locally.")
+	return True
+
+@traced("warm_up_from_access_profile")
+def warm_up_from_access_profile(target:str) -> int:
+	"""
+	Replays the access profile of target in parallel. Files that were served last time are downloaded to LOCAL_REPOSITORY_DIRECTORY if they are missing,
+	and small files are loaded into the hot set of the repository server.
+	Returns:
+		int: Count of files that are available locally after warm up.
+	"""
+
+	def warm_up(served_path:str) -> bool:
+		repository_path:str = served_path.lstrip("/")
+		file_local_path:str = os.path.join(LOCAL_REPOSITORY_DIRECTORY, repository_path.replace("/", "\\"))
+
+		if not os.path.exists(file_local_path):
+			# Locally compiled artifacts will appear when they are compiled. Metadata is generated by the repository server.
+			if is_local_dependency_repository_path(repository_path) or os.path.basename(repository_path) == "maven-metadata.xml":
+				return False
+			if download_file_from_3rd_repos(repository_path) is None:
+				return False
+
+		if os.path.getsize(file_local_path) <= HOT_FILE_CACHE_MAX_FILE_SIZE:
+			read_hot_file(file_local_path)
+		return True
+
+	profile:Dict[str, Dict[str, Any]] = AccessProfileRecorder.load(target)
+	served_paths:List[str] = sorted(set(entry["override"] or requested_path for requested_path, entry in profile.items() if entry["hits"] > 0))
+	if not served_paths:
+		return 0
+
+	color_print(Bcolors.OKGREEN, "Warming up repository server with " + str(len(served_paths)) + " files from the access profile of " + target)
+
+	with ThreadPoolExecutor(max_workers=PREFETCH_WORKER_COUNT) as executor:
+		warmed_up_count:int = sum(executor.map(warm_up, served_paths))
+
+	color_print(Bcolors.OKGREEN, "Warm up done. " + str(warmed_up_count) + "/" + str(len(served_paths)) + " files available locally.")
+	return warmed_up_count
+
+def show_access_profiles(target:None | str):
+	"""Print summary of saved access profiles. If target is None, all profiles are shown."""
+
+	if not os.path.exists(ACCESS_PROFILE_DIRECTORY):
+		print("No access profiles.")
+		return
+
+	for filename in sorted(os.listdir(ACCESS_PROFILE_DIRECTORY)):
+		profile_target, profile = AccessProfileRecorder.load_file(os.path.join(ACCESS_PROFILE_DIRECTORY, filename))
+		if target is not None and profile_target != target:
+			continue
+
+		hits:int = sum(entry["hits"] for entry in profile.values())
+		misses:int = sum(entry["misses"] for entry in profile.values())
+		overrides:int = len([entry for entry in profile.values() if entry["override"] is not None])
+
+		color_print(Bcolors.OKGREEN, profile_target)
+		print("  paths: " + str(len(profile)) + ", hits: " + str(hits) + ", misses: " + str(misses) + ", overrides: " + str(overrides))
+		if target is None:
+			continue
+
+		for requested_path, entry in sorted(profile.items()):
+			override:str = " -> " + entry["override"] if entry["override"] is not None else ""
+			print("  " + requested_path + override + " (hits: " + str(entry["hits"]) + ", misses: " + str(entry["misses"]) + ")")
+
+def clear_access_profiles(target:None | str):
+	"""Remove saved access profiles. If target is None, all profiles are removed."""
+
+	if target is not None:
+		profile_file_path:str = AccessProfileRecorder.profile_file_path(target)
+		if os.path.exists(profile_file_path):
+			os.remove(profile_file_path)
+		color_print(Bcolors.OKGREEN, "Cleared access profile of " + target)
+		return
+
+	if os.path.exists(ACCESS_PROFILE_DIRECTORY):
+		shutil.rmtree(ACCESS_PROFILE_DIRECTORY, onerror=remove_readonly)
+	color_print(Bcolors.OKGREEN, "Cleared all access profiles")
+
 def remove_readonly(func, path, _):
 	"""Clear the read-only flag and retry deletion."""
 	os.chmod(path, stat.S_IWRITE)  # Grant write permission
@@ -669,27 +1835,212 @@ def print_maven_output(result:subprocess.CompletedProcess):
 	color_print(Bcolors.OKGREEN, "</maven_output>")
 	print()
 
+def run_maven(maven_arguments:List[str], cwd:str) -> Tuple[subprocess.CompletedProcess, Dict[str, float]]:
+	"""
+	Run maven and measure it.
+	Returns:
+		Tuple[subprocess.CompletedProcess, Dict[str, float]]: Result and {"wall": seconds, "cpu": seconds, "peak_memory": bytes}. cpu and peak_memory are 0 if they can't be measured.
+	"""
+
+	with tracer.span("maven", cwd=cwd, arguments=" ".join(maven_arguments)):
+		return _run_maven(maven_arguments, cwd)
+
+# Set when the missing psutil has been reported, so that the warning is printed only once.
+psutil_missing_warned:bool = False
+
+def _run_maven(maven_arguments:List[str], cwd:str) -> Tuple[subprocess.CompletedProcess, Dict[str, float]]:
+	global psutil_missing_warned
+	if psutil is None and not psutil_missing_warned:
+		psutil_missing_warned = True
+		color_print(Bcolors.WARNING, "psutil is not installed (pip install psutil), so peak memory" + (" and CPU time" if resource is None else "") + " of maven runs will be recorded as 0.")
+
+	arguments:List[str] = [MAVEN_EXECUTABLE] + maven_arguments
+	children_usage_before = resource.getrusage(resource.RUSAGE_CHILDREN) if resource is not None else None
+	start_time:float = time.perf_counter()
+	process = subprocess.Popen(arguments, cwd=cwd, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=maven_environment)
+
+	# maven.bat starts java as a child process, so the whole process tree is sampled.
+	peak_memory:List[int] = [0]
+	cpu_by_pid:Dict[int, float] = {}
+	sampling_done = threading.Event()
+
+	def sample_process_tree():
+		try:
+			root = psutil.Process(process.pid)
+			while not sampling_done.is_set():
+				memory:int = 0
+				for sampled_process in [root] + root.children(recursive=True):
+					try:
+						memory += sampled_process.memory_info().rss
+						cpu_times = sampled_process.cpu_times()
+						cpu_by_pid[sampled_process.pid] = cpu_times.user + cpu_times.system
+					except psutil.Error:
+						continue
+				peak_memory[0] = max(peak_memory[0], memory)
+				sampling_done.wait(0.5)
+		except psutil.Error:
+			return
+
+	sampler_thread:None | threading.Thread = None
+	if psutil is not None:
+		sampler_thread = threading.Thread(target=sample_process_tree, daemon=True)
+		sampler_thread.start()
+
+	stdout, stderr = process.communicate()
+	measurements:Dict[str, float] = {"wall": time.perf_counter() - start_time, "cpu": 0.0, "peak_memory": 0.0}
+
+	if sampler_thread is not None:
+		sampling_done.set()
+		sampler_thread.join()
+		measurements["cpu"] = sum(cpu_by_pid.values())
+		measurements["peak_memory"] = float(peak_memory[0])
+	elif children_usage_before is not None:
+		children_usage_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+		measurements["cpu"] = (children_usage_after.ru_utime + children_usage_after.ru_stime) - (children_usage_before.ru_utime + children_usage_before.ru_stime)
+		# peak_memory stays 0. ru_maxrss is the biggest child of the whole process so far, not of this run, so it can't be attributed to the module.
+
+	return subprocess.CompletedProcess(arguments, process.returncode, stdout, stderr), measurements
+
+class BuildHistory:
+	"""Measurements of latest maven runs by module signature and kind ("compile" or "models_base")."""
+
+	def __init__(self, history_file_path:str):
+		self.history_file_path:str = history_file_path
+		self.lock = threading.Lock()
+		self.runs_by_signature:None | Dict[str, Dict[str, List[Dict[str, float]]]] = None
+
+	def _runs(self) -> Dict[str, Dict[str, List[Dict[str, float]]]]:
+		if self.runs_by_signature is None:
+			self.runs_by_signature = {}
+			if os.path.exists(self.history_file_path):
+				with open(self.history_file_path, "r") as f:
+					self.runs_by_signature = json.load(f)
+		return self.runs_by_signature
+
+	def record(self, pom_signature:str, kind:str, measurements:Dict[str, float]):
+		with self.lock:
+			runs:List[Dict[str, float]] = self._runs().setdefault(pom_signature, {}).setdefault(kind, [])
+			runs.append(measurements)
+			del runs[:-BUILD_HISTORY_LENGTH]
+
+			with open(self.history_file_path, "w") as f:
+				json.dump(self._runs(), f, indent=1, sort_keys=True)
+
+	def predicted_duration(self, pom_signature:str) -> None | float:
+		"""Average wall-clock seconds of compiling (and generating ModelsBase of) the module. None if it has never been built."""
+		with self.lock:
+			runs_by_kind:None | Dict[str, List[Dict[str, float]]] = self._runs().get(pom_signature)
+		if not runs_by_kind:
+			return None
+		return sum(sum(run["wall"] for run in runs) / len(runs) for runs in runs_by_kind.values() if runs)
+
+build_history = BuildHistory(BUILD_HISTORY_FILE)
+
+def compute_chain_durations(pom_infos:List[PomInfo]) -> Dict[str, float]:
+	"""
+	Predicted duration of the longest chain of local dependencies starting from every local pom reachable from pom_infos, including the pom itself.
+	Modules without history count as 0 seconds.
+	"""
+
+	chain_duration_by_signature:Dict[str, float] = {}
+	visiting:List[str] = []
+
+	def chain_duration(pom_info:PomInfo) -> float:
+		if pom_info.signature in chain_duration_by_signature:
+			return chain_duration_by_signature[pom_info.signature]
+		if pom_info.is_3rd or pom_info.signature in visiting:
+			return 0.0
+
+		visiting.append(pom_info.signature)
+		longest_dependency_chain:float = max([chain_duration(dependency) for dependency in pom_info.dependencies] + [0.0])
+		visiting.remove(pom_info.signature)
+
+		chain_duration_by_signature[pom_info.signature] = (build_history.predicted_duration(pom_info.signature) or 0.0) + longest_dependency_chain
+		return chain_duration_by_signature[pom_info.signature]
+
+	for pom_info in pom_infos:
+		chain_duration(pom_info)
+	return chain_duration_by_signature
+
+def report_build_prediction(pom_infos:List[PomInfo], chain_duration_by_signature:Dict[str, float]):
+	"""Print critical path and predicted total build time of compiling every local module from scratch."""
+
+	# Critical path: follow the dependency with the longest chain.
+	critical_path:List[PomInfo] = []
+	current:None | PomInfo = max(pom_infos, key=lambda pom_info: chain_duration_by_signature.get(pom_info.signature, 0.0), default=None)
+	while current is not None and current not in critical_path:
+		critical_path.append(current)
+		local_dependencies:List[PomInfo] = [dependency for dependency in current.dependencies if dependency.signature in chain_duration_by_signature]
+		current = max(local_dependencies, key=lambda dependency: chain_duration_by_signature[dependency.signature], default=None)
+
+	modules_without_history:List[str] = [pom_signature for pom_signature in chain_duration_by_signature if build_history.predicted_duration(pom_signature) is None]
+	predicted_total:float = sum(build_history.predicted_duration(pom_signature) or 0.0 for pom_signature in chain_duration_by_signature)
+
+	color_print(Bcolors.OKGREEN, "Critical path (" + format(chain_duration_by_signature.get(critical_path[0].signature, 0.0) if critical_path else 0.0, ".0f") + " s):")
+	for pom_info in reversed(critical_path):
+		predicted_duration:None | float = build_history.predicted_duration(pom_info.signature)
+		print("  " + pom_info.signature + ": " + ("no history" if predicted_duration is None else format(predicted_duration, ".0f") + " s"))
+	color_print(Bcolors.OKGREEN, "Predicted total build time if every module is compiled: " + format(predicted_total, ".0f") + " s (" + str(len(chain_duration_by_signature)) + " local modules, " + str(len(modules_without_history)) + " without history)")
+
 # If directory has been already checked, checking it again is not necessary.
 files_changed_in_directory_already_checked:List = []
 
+def create_models_base_key(pom_info:PomInfo, models_xml_file_path:str) -> str:
+	"""ModelsBase is generated only from models.xml by MAVEN_FLASH_GENERATOR, so their content identifies the generated tree."""
+	sha256 = hashlib.sha256()
+	sha256.update((pom_info.signature + "\n" + MAVEN_FLASH_GENERATOR + "\n").encode("utf-8"))
+	with open(models_xml_file_path, "rb") as f:
+		sha256.update(f.read())
+	return sha256.hexdigest()
+
+def models_base_inputs_are_local(pom_info:PomInfo, pom_info_by_pom_signature:Dict[str, PomInfo]) -> bool:
+	"""
+	True if MAVEN_FLASH_GENERATOR, all dependencies of pom_info and their dependencies exist in LOCAL_REPOSITORY_DIRECTORY, so maven doesn't need to check for updates.
+	The dependencies are followed as far as they are mapped in pom_info_by_pom_signature. Dependencies of the generator are followed too, if it is mapped.
+	"""
+	generator_group_id, generator_artifact_id, generator_version = MAVEN_FLASH_GENERATOR.split(":")
+	generator_pom_info:PomInfo = pom_info_by_pom_signature.get(create_pom_signature(generator_group_id, generator_artifact_id, generator_version), PomInfo(generator_group_id, generator_artifact_id, generator_version, "", True))
+
+	checked_signatures:set = set()
+	stack:List[PomInfo] = list(pom_info.dependencies) + [generator_pom_info]
+	while stack:
+		current_pom_info:PomInfo = stack.pop()
+		if current_pom_info.signature in checked_signatures:
+			continue
+		checked_signatures.add(current_pom_info.signature)
+
+		group_id_as_path:str = "\\".join(current_pom_info.group_id.split("."))
+		if not os.path.exists(os.path.join(LOCAL_REPOSITORY_DIRECTORY, group_id_as_path + "\\" + current_pom_info.artifact_id + "\\" + current_pom_info.version + "\\")):
+			return False
+		stack += pom_info_by_pom_signature.get(current_pom_info.signature, current_pom_info).dependencies
+	return True
+
+@traced("generate_models_base")
 def generate_models_base(pom_info:PomInfo, pom_info_by_pom_signature:Dict[str, PomInfo]) -> bool:
 	"""
-	Generate ModelsBase.
+	Generate ModelsBase. Generated tree and its POM index are cached in MODELS_BASE_CACHE_DIRECTORY by content of models.xml and generator version,
+	so unchanged models are restored from cache without running maven.
 	Returns:
 		bool: True if generation was successful, False if not.
 	"""
 
-	def map_models_base(generation_result_path:str, models_base_pom_signature:str, models_base_group_id:str, models_base_artifact_id:str):
-		pom_dir_by_pom_signature = map_pom_paths(generation_result_path)
-
+	def map_models_base(generation_result_path:str, pom_dir_by_pom_signature:Dict[str, str], models_base_pom_signature:str, models_base_group_id:str, models_base_artifact_id:str):
 		if models_base_pom_signature not in pom_info_by_pom_signature:
 			models_base_pom_info = create_pom_info(models_base_group_id, models_base_artifact_id, pom_info.version, pom_dir_by_pom_signature)
 		else:
 			models_base_pom_info = pom_info_by_pom_signature[models_base_pom_signature]
+			# Already mapped from this tree during this build
+			if models_base_pom_info.path == generation_result_path:
+				return
 
 		models_base_pom_info.path = generation_result_path
 		map_pom_dependencies(models_base_pom_info, pom_dir_by_pom_signature, pom_info_by_pom_signature)
 
+	def load_pom_index(cache_entry_path:str) -> Dict[str, str]:
+		with open(os.path.join(cache_entry_path, "pom_index.json"), "r") as f:
+			relative_pom_dir_by_pom_signature:Dict[str, str] = json.load(f)
+		return {pom_signature: os.path.join(generation_result_path, relative_pom_dir) for pom_signature, relative_pom_dir in relative_pom_dir_by_pom_signature.items()}
+
 	models_base_group_id:str = pom_info.group_id.replace(".server", ".client")
 	models_base_artifact_id = pom_info.artifact_id + "ModelsBase"
 	models_base_pom_signature = create_pom_signature(models_base_group_id, models_base_artifact_id, pom_info.version)
@@ -699,20 +2050,37 @@ def generate_models_base(pom_info:PomInfo, pom_info_by_pom_signature:Dict[str, P
 	generation_result_path:str = os.path.join(compilation_work_dir, "target\\client\\fp10\\")
 	print("generation_result_path: " + generation_result_path)
 
-	# Check if ModelsBase is already generated
-	if os.path.exists(generation_result_path):
-		if pom_info.signature in files_changed_in_directory_already_checked: 
-			map_models_base(generation_result_path, models_base_pom_signature, models_base_group_id, models_base_artifact_id)
-			return True
-
-		files_changed_in_directory_already_checked.append(pom_info.signature)
-		if not file_hash_manager.files_changed_in_directory(pom_info.path):
-			map_models_base(generation_result_path, models_base_pom_signature, models_base_group_id, models_base_artifact_id)
-			return True
+	models_base_key:str = create_models_base_key(pom_info, os.path.join(compilation_work_dir, "target\\classes\\models.xml"))
+	cache_entry_path:str = os.path.join(MODELS_BASE_CACHE_DIRECTORY, models_base_key)
+	# Key of the tree that is currently in generation_result_path. compile_pom removes the whole work dir, so this is removed with it.
+	generated_key_file_path:str = os.path.join(compilation_work_dir, "target\\models_base.key")
+
+	# Check if ModelsBase with same models.xml is already generated
+	if os.path.exists(os.path.join(cache_entry_path, "pom_index.json")):
+		generated_key:None | str = None
+		if os.path.exists(generated_key_file_path) and os.path.exists(generation_result_path):
+			with open(generated_key_file_path, "r") as f:
+				generated_key = f.read().strip()
+
+		if generated_key != models_base_key:
+			color_print(Bcolors.OKGREEN, "Restoring ModelsBase from cache: " + models_base_pom_signature)
+			if os.path.exists(generation_result_path):
+				shutil.rmtree(generation_result_path, onerror=remove_readonly)
+			shutil.copytree(os.path.join(cache_entry_path, "fp10"), generation_result_path)
+			with open(generated_key_file_path, "w") as f:
+				f.write(models_base_key)
+
+		map_models_base(generation_result_path, load_pom_index(cache_entry_path), models_base_pom_signature, models_base_group_id, models_base_artifact_id)
+		return True
 	
 	box_print("Generating ModelsBase for: " + pom_info.signature)
 
-	result = subprocess.run(["mvn.bat", "-U", "install", MAVEN_FLASH_GENERATOR + ":generate"], cwd=compilation_work_dir, text=True, capture_output=True, env=maven_environment)
+	# -U makes maven check every snapshot and missing artifact from remote repositories. It is not needed when everything is already local.
+	maven_arguments:List[str] = ["install", MAVEN_FLASH_GENERATOR + ":generate"]
+	if not models_base_inputs_are_local(pom_info, pom_info_by_pom_signature):
+		maven_arguments.insert(0, "-U")
+
+	result, measurements = run_maven(maven_arguments, compilation_work_dir)
 
 	print_maven_output(result)
 
@@ -728,33 +2096,60 @@ def generate_models_base(pom_info:PomInfo, pom_info_by_pom_signature:Dict[str, P
 		return False
 
 	color_print(Bcolors.OKGREEN, "ModelsBase generated successfully: " + models_base_pom_signature)
+	build_history.record(pom_info.signature, "models_base", measurements)
+
+	pom_dir_by_pom_signature:Dict[str, str] = map_pom_paths(generation_result_path)
+
+	# Save generated tree and its POM index to cache.
+	cache_entry_temporary_path:str = cache_entry_path + ".part"
+	if os.path.exists(cache_entry_temporary_path):
+		shutil.rmtree(cache_entry_temporary_path, onerror=remove_readonly)
+	shutil.copytree(generation_result_path, os.path.join(cache_entry_temporary_path, "fp10"))
+	with open(os.path.join(cache_entry_temporary_path, "pom_index.json"), "w") as f:
+		json.dump({pom_signature: os.path.relpath(pom_dir, generation_result_path) for pom_signature, pom_dir in pom_dir_by_pom_signature.items()}, f, indent=2)
+	if os.path.exists(cache_entry_path):
+		shutil.rmtree(cache_entry_path, onerror=remove_readonly)
+	os.replace(cache_entry_temporary_path, cache_entry_path)
+	with open(generated_key_file_path, "w") as f:
+		f.write(models_base_key)
+
+	map_models_base(generation_result_path, pom_dir_by_pom_signature, models_base_pom_signature, models_base_group_id, models_base_artifact_id)
+	return True
 
-	map_models_base(generation_result_path, models_base_pom_signature, models_base_group_id, models_base_artifact_id)
+def pom_compilation_needed(pom_info:PomInfo) -> bool:
+	"""True if pom has not been compiled before or its source code has changed since then."""
+	group_id_as_path:str = "\\".join(pom_info.group_id.split("."))
+	repository_path_for_compilation_results = os.path.join(LOCAL_REPOSITORY_DIRECTORY, group_id_as_path + "\\" + pom_info.artifact_id + "\\" + pom_info.version + "\\")
+
+	# Check if pom is already compiled
+	if os.path.exists(os.path.join(repository_path_for_compilation_results, pom_info.artifact_id + "-" + pom_info.version + ".pom")):
+		if pom_info.signature in files_changed_in_directory_already_checked: 
+			return False
+
+		files_changed_in_directory_already_checked.append(pom_info.signature)
+		if not file_hash_manager.files_changed_in_directory(pom_info.path):
+			return False
+	
 	return True
 
-def compile_pom(pom_info:PomInfo) -> bool:
+def forget_compilation_check(pom_info:PomInfo):
+	"""
+	Make pom_compilation_needed check pom again. Needed when compilation fails, because pom_compilation_needed has already saved the new hashes of its source code
+	and the next build would take the pom as cached.
+	"""
+	if pom_info.signature in files_changed_in_directory_already_checked:
+		files_changed_in_directory_already_checked.remove(pom_info.signature)
+	file_hash_manager.forget_directory(pom_info.path)
+
+@traced("compile_pom")
+def compile_pom(pom_info:PomInfo, force:bool = False) -> bool:
 	"""
-	Compiles pom. It will not compile the pom again, if it was compiled before and no source code has changed since then. Adds the compiled pom to REPOSITORY_FOLDER_PATH.
+	Compiles pom. It will not compile the pom again, if it was compiled before and no source code has changed since then, unless force is true. Adds the compiled pom to REPOSITORY_FOLDER_PATH.
 	Returns:
 		bool: True if compilation was successful, False if not.
 	"""
 
-	def compilation_needed(pom_info:PomInfo) -> bool:
-		group_id_as_path:str = "\\".join(pom_info.group_id.split("."))
-		repository_path_for_compilation_results = os.path.join(LOCAL_REPOSITORY_DIRECTORY, group_id_as_path + "\\" + pom_info.artifact_id + "\\" + pom_info.version + "\\")
-
-		# Check if pom is already compiled
-		if os.path.exists(os.path.join(repository_path_for_compilation_results, pom_info.artifact_id + "-" + pom_info.version + ".pom")):
-			if pom_info.signature in files_changed_in_directory_already_checked: 
-				return False
-
-			files_changed_in_directory_already_checked.append(pom_info.signature)
-			if not file_hash_manager.files_changed_in_directory(pom_info.path):
-				return False
-		
-		return True
-
-	if not compilation_needed(pom_info):
+	if not force and not pom_compilation_needed(pom_info):
 		return True
 
 	# Compile the pom
@@ -769,10 +2164,11 @@ def compile_pom(pom_info:PomInfo) -> bool:
 		shutil.rmtree(compilation_work_dir, onerror=remove_readonly)
 
 	# Copy the project into compilation_cache
-	shutil.copytree(pom_info.path, compilation_work_dir)
+	with tracer.span("copytree", pom_info.signature):
+		shutil.copytree(pom_info.path, compilation_work_dir)
 	print("Copying project to " + compilation_work_dir + " from " + pom_info.path + " for compilation.")
 
-	result = subprocess.run(["mvn.bat", "clean", "install", "-P release"], cwd=compilation_work_dir, text=True, capture_output=True, env=maven_environment)
+	result, measurements = run_maven(["clean", "install", "-P release"], compilation_work_dir)
 
 	print_maven_output(result)
 
@@ -783,6 +2179,8 @@ def compile_pom(pom_info:PomInfo) -> bool:
 		color_print(Bcolors.FAIL, "Compilation failed: " + pom_info.signature)
 		return False
 
+	build_history.record(pom_info.signature, "compile", measurements)
+
 	repository_path_for_compilation_results = os.path.join(LOCAL_REPOSITORY_DIRECTORY, group_id_as_path + "\\" + pom_info.artifact_id + "\\" + pom_info.version + "\\")
 
 	if not os.path.exists(repository_path_for_compilation_results):
@@ -814,19 +2212,53 @@ def compile_pom(pom_info:PomInfo) -> bool:
 	color_print(Bcolors.OKGREEN, "Compiled successfully: " + pom_info.signature)
 	return True
 	
-def compile_pom_and_its_dependencies(pom_info:PomInfo, pom_info_by_pom_signature:Dict[str, PomInfo]) -> bool:
+class BuildSummary:
+	"""Signatures of local poms by what happened to them during the build."""
+
+	def __init__(self):
+		self.built:List[str] = []
+		self.cached:List[str] = []
+		self.skipped:List[str] = []
+		self.failed:List[str] = []
+
+	def to_json(self) -> Dict[str, List[str]]:
+		return {"built": self.built, "cached": self.cached, "skipped": self.skipped, "failed": self.failed}
+
+def compile_pom_and_its_dependencies(pom_info:PomInfo, pom_info_by_pom_signature:Dict[str, PomInfo], force_compile_signatures:None | List[str] = None, build_summary:None | BuildSummary = None) -> bool:
 	"""
 	Compiles pom and its dependencys. Adds the compiled pom and compiled dependencies to REPOSITORY_FOLDER_PATH.
+	Poms in force_compile_signatures are compiled even if their source code has not changed.
 	Returns:
 		bool: True if compilation was successful, False if not.
 	"""
+	return compile_poms_and_their_dependencies([pom_info], pom_info_by_pom_signature, force_compile_signatures, build_summary)
 
-	stack:List[PomInfo] = [pom_info]
+def compile_poms_and_their_dependencies(pom_infos:List[PomInfo], pom_info_by_pom_signature:Dict[str, PomInfo], force_compile_signatures:None | List[str] = None, build_summary:None | BuildSummary = None) -> bool:
+	"""
+	Compiles poms and the union of their dependencies. Poms shared by many of them are compiled only once.
+	What happened to every local pom is added to build_summary.
+	Returns:
+		bool: True if compilation of every pom in pom_infos was successful, False if not.
+	"""
+
+	if build_summary is None:
+		build_summary = BuildSummary()
+
+	# Longest remaining dependency chains are started first. Stack is popped from the end, so it is kept in ascending order of chain duration.
+	chain_duration_by_signature:Dict[str, float] = compute_chain_durations(pom_infos)
+	report_build_prediction(pom_infos, chain_duration_by_signature)
+
+	def by_chain_duration(poms:List[PomInfo]) -> List[PomInfo]:
+		return sorted(poms, key=lambda pom: chain_duration_by_signature.get(pom.signature, 0.0))
+
+	stack:List[PomInfo] = by_chain_duration(list(reversed(pom_infos)))
 	missing_dependencies:List[PomInfo] = []
 	resolved_dependencies:List[PomInfo] = []
 
 	while stack:
 		current_pom_info:PomInfo = stack.pop()
+		if current_pom_info in resolved_dependencies:
+			continue
 		#print("trying to compile: " + current_pom_info.signature)#, "dependencies:", [dependency.signature for dependency in current_pom_info.dependencies], "path:", current_pom_info.path)
 
 		unsolvable_dependencies:bool = False
@@ -875,6 +2307,8 @@ def compile_pom_and_its_dependencies(pom_info:PomInfo, pom_info_by_pom_signature
 				if dont_compile_group_id == dependency.group_id and dont_compile_artifact_id == dependency.artifact_id and dont_compile_version == dependency.version:
 					color_print(Bcolors.OKGREEN, "Skipping dependency " + dependency.signature + " because it is in DONT_COMPILE list.")
 					dont_compile_flag = True
+					if dependency.signature not in build_summary.skipped:
+						build_summary.skipped.append(dependency.signature)
 					break
 
 			if dont_compile_flag:
@@ -884,12 +2318,12 @@ def compile_pom_and_its_dependencies(pom_info:PomInfo, pom_info_by_pom_signature
 
 		if unsolvable_dependencies:
 			missing_dependencies.append(current_pom_info)
-			stack += dependencies_needing_compile
+			stack += by_chain_duration(dependencies_needing_compile)
 			continue
 
 		if dependencies_needing_compile:
 			stack.append(current_pom_info)
-			stack += dependencies_needing_compile
+			stack += by_chain_duration(dependencies_needing_compile)
 			continue
 
 		if current_pom_info.path == "":
@@ -900,16 +2334,27 @@ def compile_pom_and_its_dependencies(pom_info:PomInfo, pom_info_by_pom_signature
 			if os.path.exists(dependency_local_repo_path):
 				color_print(Bcolors.WARNING, "Can't compile pom " + current_pom_info.signature + " because source code is missing." + " Using one from local repo.")
 				resolved_dependencies.append(current_pom_info)
+				build_summary.skipped.append(current_pom_info.signature)
 				continue
 
 			color_print(Bcolors.FAIL, "Can't compile pom " + current_pom_info.signature + " because its source code is missing.")
 			missing_dependencies.append(current_pom_info)
 			continue
 
-		compilation_success:bool = compile_pom(current_pom_info)
-		if not compilation_success:
-			missing_dependencies.append(current_pom_info)
-			continue
+		force_compile:bool = force_compile_signatures is not None and current_pom_info.signature in force_compile_signatures
+		if not force_compile and not pom_compilation_needed(current_pom_info):
+			build_summary.cached.append(current_pom_info.signature)
+		else:
+			compiled:bool = False
+			try:
+				compiled = compile_pom(current_pom_info, True)
+			finally:
+				if not compiled:
+					forget_compilation_check(current_pom_info)
+			if not compiled:
+				missing_dependencies.append(current_pom_info)
+				continue
+			build_summary.built.append(current_pom_info.signature)
 
 		group_id_as_path:str = "\\".join(current_pom_info.group_id.split("."))
 		compilation_work_dir = os.path.join(COMPILATION_WORK_DIRECTORY, group_id_as_path + "\\" + current_pom_info.artifact_id + "\\" + current_pom_info.version + "\\")
@@ -927,8 +2372,13 @@ def compile_pom_and_its_dependencies(pom_info:PomInfo, pom_info_by_pom_signature
 	color_print(Bcolors.OKGREEN, "Total dependencies resolved: " + str(len(resolved_dependencies)) + ". Total dependencies missing: " + str(len(missing_dependencies)))
 	color_print(Bcolors.OKGREEN, "Local dependencies resolved: " + str(local_dependencies_resolved_count) + ". Local dependencies missing: " + str(local_dependencies_missing_count))
 
-	if pom_info.signature in missing_dependencies:
-		return False
+	for missing_dependency in missing_dependencies:
+		if missing_dependency.signature not in build_summary.failed:
+			build_summary.failed.append(missing_dependency.signature)
+
+	for pom_info in pom_infos:
+		if pom_info in missing_dependencies:
+			return False
 
 	return True
 
@@ -937,22 +2387,397 @@ def start_repository_server():
 
 	# Create and start the HTTP server with custom request handler
 	httpd = HTTPServer(server_address, RepositoryRequestHandler)
-	color_print(Bcolors.OKGREEN, "Server started at http://localhost:" + str(REPOSITORY_SERVER_PORT))
+	color_print(Bcolors.OKGREEN, "Server started at http://localhost:" + str(REPOSITORY_SERVER_PORT) + ", metrics at http://localhost:" + str(REPOSITORY_SERVER_PORT) + METRICS_PATH)
+	if METRICS_SNAPSHOT_INTERVAL > 0:
+		threading.Thread(target=write_metrics_snapshots, daemon=True).start()
 	httpd.serve_forever()
 
-if RUN_AS_REPOSITORY_SERVER: 
-	start_repository_server()
-else:
-	server_thread = threading.Thread(target=start_repository_server, daemon=True)
-	server_thread.start()
+def build_pom(pom_info:PomInfo, pom_dir_by_pom_signature:Dict[str, str], pom_info_by_pom_signature:None | Dict[str, PomInfo] = None, force_compile_signatures:None | List[str] = None) -> bool:
+	"""
+	Maps dependencies of pom (unless it is already in pom_info_by_pom_signature), fetches 3rd party artifacts and compiles pom and its dependencies.
+	Returns:
+		bool: True if compilation was successful, False if not.
+	"""
+	return build_poms([pom_info], pom_dir_by_pom_signature, pom_info_by_pom_signature, force_compile_signatures)
 
-	pom_dir_by_pom_signature:Dict[str, str] = map_pom_paths(MAVEN_PROJECTS_DIRECTORY)
+def build_poms(pom_infos:List[PomInfo], pom_dir_by_pom_signature:Dict[str, str], pom_info_by_pom_signature:None | Dict[str, PomInfo] = None, force_compile_signatures:None | List[str] = None, build_summary:None | BuildSummary = None) -> bool:
+	"""
+	Maps dependencies of all poms into one graph, fetches 3rd party artifacts and compiles the union of the poms and their dependencies once.
+	Returns:
+		bool: True if compilation of every pom was successful, False if not.
+	"""
 
-	print("Please enter the information of the POM you want to compile:")
-	pom_group_id:str = input("Group ID: ")
-	pom_artifact_id:str = input("Artifact ID: ")
-	pom_version:str = input("Version Number: ")
+	if pom_info_by_pom_signature is None:
+		pom_info_by_pom_signature = {}
 
-	pom_info:PomInfo = create_pom_info(pom_group_id, pom_artifact_id, pom_version, pom_dir_by_pom_signature)
-	pom_info_by_pom_signature:Dict[str, PomInfo] = map_pom_dependencies(pom_info, pom_dir_by_pom_signature)
-	compile_pom_and_its_dependencies(pom_info, pom_info_by_pom_signature)
+	# Access profile is recorded per target, so it is recorded only when one target is built.
+	if len(pom_infos) == 1:
+		access_profile_recorder.start(pom_infos[0].signature)
+
+	# Warm up the repository server while dependencies are mapped.
+	warm_up_threads:List[threading.Thread] = [threading.Thread(target=warm_up_from_access_profile, args=(pom_info.signature,), daemon=True) for pom_info in pom_infos]
+	for warm_up_thread in warm_up_threads:
+		warm_up_thread.start()
+
+	mapped_pom_infos:List[PomInfo] = []
+	for pom_info in pom_infos:
+		if pom_info.signature in pom_info_by_pom_signature:
+			pom_info = pom_info_by_pom_signature[pom_info.signature]
+		else:
+			with tracer.profile_mapping():
+				map_pom_dependencies(pom_info, pom_dir_by_pom_signature, pom_info_by_pom_signature)
+		if pom_info not in mapped_pom_infos:
+			mapped_pom_infos.append(pom_info)
+
+	for warm_up_thread in warm_up_threads:
+		warm_up_thread.join()
+
+	success:bool = False
+	if not prefetch_3rd_artifacts(pom_info_by_pom_signature) and OFFLINE_MODE:
+		color_print(Bcolors.FAIL, "Offline mode: 3rd party artifacts are missing from local repository. Not compiling.")
+		if build_summary is not None:
+			build_summary.failed += [pom_info.signature for pom_info in mapped_pom_infos]
+	else:
+		success = compile_poms_and_their_dependencies(mapped_pom_infos, pom_info_by_pom_signature, force_compile_signatures, build_summary)
+
+	access_profile_recorder.save()
+
+	hot_file_cache_stats:Dict[str, int] = hot_file_cache.stats()
+	color_print(Bcolors.OKGREEN, "Repository server hot file cache: " + ", ".join(key + ": " + str(value) for key, value in hot_file_cache_stats.items()))
+	return success
+
+def read_batch_targets(targets:List[str], targets_file_path:None | str) -> List[str]:
+	"""
+	Targets from command line and from file (one groupId:artifactId:version per line, # starts a comment). Duplicates are removed.
+	Raises ValueError for malformed target. Targets from file are reported with their line number.
+	"""
+	for target in targets:
+		parse_pom_signature(target)
+
+	all_targets:List[str] = list(targets)
+	if targets_file_path is not None:
+		with open(targets_file_path, "r") as f:
+			for line_number, line in enumerate(f, 1):
+				line = line.split("#")[0].strip()
+				if line == "":
+					continue
+				try:
+					parse_pom_signature(line)
+				except ValueError as e:
+					raise ValueError(targets_file_path + ":" + str(line_number) + ": " + str(e))
+				all_targets.append(line)
+
+	unique_targets:List[str] = []
+	for target in all_targets:
+		if target not in unique_targets:
+			unique_targets.append(target)
+	return unique_targets
+
+def run_batch_build(targets:List[str], summary_file_path:None | str) -> bool:
+	"""Build all targets without asking anything. Prints or saves JSON summary of the build."""
+	with tracer.profile_mapping():
+		pom_dir_by_pom_signature:Dict[str, str] = map_pom_paths(MAVEN_PROJECTS_DIRECTORY)
+
+	pom_infos:List[PomInfo] = []
+	for target in targets:
+		group_id, artifact_id, version_ = parse_pom_signature(target)
+		pom_infos.append(create_pom_info(group_id, artifact_id, version_, pom_dir_by_pom_signature))
+
+	build_summary = BuildSummary()
+	success:bool = build_poms(pom_infos, pom_dir_by_pom_signature, build_summary=build_summary)
+
+	summary:Dict[str, Any] = {"targets": targets, "success": success}
+	summary.update(build_summary.to_json())
+	summary["failed_targets"] = [target for target in targets if target in build_summary.failed]
+
+	summary_json:str = json.dumps(summary, indent=2)
+	if summary_file_path is None:
+		print(summary_json)
+	else:
+		with open(summary_file_path, "w") as f:
+			f.write(summary_json)
+		color_print(Bcolors.OKGREEN, "Build summary saved to " + summary_file_path)
+	return success
+
+def parse_pom_signature(pom_signature:str) -> Tuple[str, str, str]:
+	parts:List[str] = pom_signature.strip().split(":")
+	if len(parts) != 3 or "" in parts:
+		raise ValueError("Expected groupId:artifactId:version, got: " + pom_signature)
+	return parts[0], parts[1], parts[2]
+
+class SourceTreeWatcher:
+	"""
+	Reports changed files under directory. Uses inotify when inotify_simple is installed, otherwise compares file sizes and modification times.
+	"""
+
+	IGNORE_SUB_FOLDERS = ["target", ".svn"]
+
+	def __init__(self, directory:str):
+		self.directory:str = directory
+		self.inotify = None
+		self.directory_by_watch:Dict[int, str] = {}
+		self.fingerprints:Dict[str, Tuple[int, int]] = {}
+
+		if inotify_simple is not None:
+			try:
+				self.inotify = inotify_simple.INotify()
+				self.add_watches(directory)
+				color_print(Bcolors.OKGREEN, "Watching " + directory + " with inotify")
+				return
+			except OSError as e:
+				color_print(Bcolors.WARNING, "inotify not available (" + str(e) + "), polling for changes instead")
+				self.inotify = None
+
+		self.fingerprints = self.compute_fingerprints()
+		color_print(Bcolors.OKGREEN, "Watching " + directory + " by polling every " + str(DAEMON_POLL_INTERVAL) + " seconds")
+
+	def add_watches(self, directory:str):
+		watch_flags = inotify_simple.flags.CREATE | inotify_simple.flags.MODIFY | inotify_simple.flags.CLOSE_WRITE | inotify_simple.flags.DELETE | inotify_simple.flags.MOVED_FROM | inotify_simple.flags.MOVED_TO
+		for dirpath, dirnames, _ in os.walk(directory):
+			dirnames[:] = [dirname for dirname in dirnames if dirname not in self.IGNORE_SUB_FOLDERS]
+			self.directory_by_watch[self.inotify.add_watch(dirpath, watch_flags)] = dirpath
+
+	def compute_fingerprints(self) -> Dict[str, Tuple[int, int]]:
+		"""{file path: (size, modification time)} of all files under the directory."""
+		fingerprints:Dict[str, Tuple[int, int]] = {}
+		directories:List[str] = [self.directory]
+		while directories:
+			with os.scandir(directories.pop()) as entries:
+				for entry in entries:
+					if entry.is_dir(follow_symlinks=False):
+						if entry.name not in self.IGNORE_SUB_FOLDERS:
+							directories.append(entry.path)
+						continue
+					entry_stat = entry.stat()
+					fingerprints[entry.path] = (entry_stat.st_size, entry_stat.st_mtime_ns)
+		return fingerprints
+
+	def wait_for_changes(self, timeout:float) -> List[str]:
+		"""Wait up to timeout seconds and return paths of changed, added and removed files."""
+		if self.inotify is not None:
+			changed_paths:List[str] = []
+			for event in self.inotify.read(timeout=int(timeout * 1000)):
+				if event.wd not in self.directory_by_watch:
+					continue
+				path:str = os.path.join(self.directory_by_watch[event.wd], event.name)
+				if event.mask & inotify_simple.flags.ISDIR:
+					if event.mask & (inotify_simple.flags.CREATE | inotify_simple.flags.MOVED_TO) and event.name not in self.IGNORE_SUB_FOLDERS:
+						self.add_watches(path)
+					continue
+				changed_paths.append(path)
+			return sorted(set(changed_paths))
+
+		time.sleep(timeout)
+		new_fingerprints:Dict[str, Tuple[int, int]] = self.compute_fingerprints()
+		changed_paths = [path for path, fingerprint in new_fingerprints.items() if self.fingerprints.get(path) != fingerprint]
+		changed_paths += [path for path in self.fingerprints if path not in new_fingerprints]
+		self.fingerprints = new_fingerprints
+		return sorted(changed_paths)
+
+class BuildDaemon:
+	"""
+	Long running build process. Keeps mapped POM paths and dependency graph in memory, rebuilds targets when their sources change
+	and accepts build requests from send_daemon_request.
+	"""
+
+	def __init__(self):
+		self.build_lock = threading.Lock()
+		with tracer.profile_mapping():
+			self.pom_dir_by_pom_signature:Dict[str, str] = map_pom_paths(MAVEN_PROJECTS_DIRECTORY)
+		self.pom_info_by_pom_signature:Dict[str, PomInfo] = {}
+		# Targets that have been requested. They are rebuilt when their sources change.
+		self.watched_targets:List[str] = []
+		self.watcher = SourceTreeWatcher(MAVEN_PROJECTS_DIRECTORY)
+
+	def build(self, target:str, force_compile_signatures:None | List[str] = None) -> bool:
+		with self.build_lock:
+			group_id, artifact_id, version_ = parse_pom_signature(target)
+			if target not in self.watched_targets:
+				self.watched_targets.append(target)
+
+			box_print("Daemon building " + target)
+			pom_info:PomInfo = create_pom_info(group_id, artifact_id, version_, self.pom_dir_by_pom_signature)
+			success:bool = build_pom(pom_info, self.pom_dir_by_pom_signature, self.pom_info_by_pom_signature, force_compile_signatures)
+			color_print(Bcolors.OKGREEN if success else Bcolors.FAIL, "Daemon build " + ("succeeded: " if success else "failed: ") + target)
+			return success
+
+	def find_pom_signature_of_path(self, path:str) -> None | str:
+		"""Signature of the POM whose directory contains path."""
+		path = os.path.normcase(os.path.abspath(path))
+		best_signature:None | str = None
+		best_length:int = -1
+		for pom_signature, pom_dir in self.pom_dir_by_pom_signature.items():
+			pom_dir = os.path.normcase(os.path.abspath(pom_dir))
+			if (path == pom_dir or path.startswith(pom_dir.rstrip(os.sep) + os.sep)) and len(pom_dir) > best_length:
+				best_signature = pom_signature
+				best_length = len(pom_dir)
+		return best_signature
+
+	def find_dependents(self, pom_signatures:List[str]) -> List[str]:
+		"""Signatures of all poms in the graph that depend directly or indirectly on pom_signatures."""
+		dependents_by_signature:Dict[str, List[str]] = {}
+		for pom_info in self.pom_info_by_pom_signature.values():
+			for dependency in pom_info.dependencies:
+				dependents_by_signature.setdefault(dependency.signature, []).append(pom_info.signature)
+
+		dependents:List[str] = []
+		stack:List[str] = list(pom_signatures)
+		while stack:
+			for dependent in dependents_by_signature.get(stack.pop(), []):
+				if dependent not in dependents and dependent not in pom_signatures:
+					dependents.append(dependent)
+					stack.append(dependent)
+		return dependents
+
+	def on_changes(self, changed_paths:List[str]):
+		with self.build_lock:
+			pom_file_changed:bool = any(os.path.basename(changed_path) == "pom.xml" for changed_path in changed_paths)
+			if pom_file_changed:
+				# Coordinates or dependencies may have changed. Map everything again, it is cheap compared to compiling.
+				color_print(Bcolors.WARNING, "pom.xml changed, mapping POMs again")
+				self.pom_dir_by_pom_signature = map_pom_paths(MAVEN_PROJECTS_DIRECTORY)
+
+			changed_signatures:List[str] = []
+			for changed_path in changed_paths:
+				pom_signature:None | str = self.find_pom_signature_of_path(changed_path)
+				if pom_signature is not None and pom_signature not in changed_signatures:
+					changed_signatures.append(pom_signature)
+
+			if not changed_signatures:
+				return
+
+			dependents:List[str] = self.find_dependents(changed_signatures)
+			if pom_file_changed:
+				self.pom_info_by_pom_signature = {}
+
+			# Changed poms are hashed again by compile_pom. Dependents have not changed, so they must be forced to compile.
+			for pom_signature in changed_signatures + dependents:
+				if pom_signature in files_changed_in_directory_already_checked:
+					files_changed_in_directory_already_checked.remove(pom_signature)
+
+		color_print(Bcolors.OKGREEN, "Changed: " + ", ".join(changed_signatures))
+		for target in list(self.watched_targets):
+			if pom_file_changed or target in changed_signatures or target in dependents:
+				try:
+					self.build(target, dependents)
+				except Exception:
+					# For example locked file on Windows. Other targets are still built and the daemon keeps running.
+					color_print(Bcolors.FAIL, "Daemon build crashed: " + target + "\n" + traceback.format_exc())
+
+	def serve_requests(self):
+		daemon = self
+
+		class DaemonRequestHandler(socketserver.StreamRequestHandler):
+			def handle(self):
+				try:
+					request:Dict[str, Any] = json.loads(self.rfile.readline().decode("utf-8"))
+					command:str = request.get("command", "")
+					if command == "build":
+						response:Dict[str, Any] = {"success": daemon.build(request["target"])}
+					elif command == "status":
+						response = {"watched_targets": daemon.watched_targets, "mapped_poms": len(daemon.pom_dir_by_pom_signature), "graph_poms": len(daemon.pom_info_by_pom_signature)}
+					else:
+						response = {"error": "Unknown command: " + command}
+				except (ValueError, KeyError) as e:
+					response = {"error": str(e)}
+				except Exception as e:
+					color_print(Bcolors.FAIL, "Daemon request failed:\n" + traceback.format_exc())
+					response = {"error": type(e).__name__ + ": " + str(e)}
+				self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+
+		server = socketserver.ThreadingTCPServer(("127.0.0.1", DAEMON_PORT), DaemonRequestHandler)
+		server.daemon_threads = True
+		color_print(Bcolors.OKGREEN, "Build daemon listening at 127.0.0.1:" + str(DAEMON_PORT))
+		server.serve_forever()
+
+	def run(self):
+		threading.Thread(target=self.serve_requests, daemon=True).start()
+		while True:
+			changed_paths:List[str] = self.watcher.wait_for_changes(DAEMON_POLL_INTERVAL)
+			if not changed_paths:
+				continue
+
+			# Editors and version control write many files at once. Wait until changes stop before building.
+			while True:
+				more_changed_paths:List[str] = self.watcher.wait_for_changes(DAEMON_POLL_INTERVAL / 2)
+				if not more_changed_paths:
+					break
+				changed_paths += more_changed_paths
+
+			try:
+				self.on_changes(sorted(set(changed_paths)))
+			except Exception:
+				color_print(Bcolors.FAIL, "Handling changes failed:\n" + traceback.format_exc())
+
+def send_daemon_request(request:Dict[str, Any]) -> Dict[str, Any]:
+	with socket.create_connection(("127.0.0.1", DAEMON_PORT)) as connection:
+		connection.sendall((json.dumps(request) + "\n").encode("utf-8"))
+		response:bytes = connection.makefile("rb").readline()
+	if response.strip() == b"":
+		return {"error": "Build daemon closed the connection without response"}
+	return json.loads(response.decode("utf-8"))
+
+if __name__ == "__main__":
+	argument_parser = argparse.ArgumentParser(description="Compile maven projects from MAVEN_PROJECTS_DIRECTORY and serve them from a local repository server.")
+	argument_parser.add_argument("--show-profiles", nargs="?", const="", default=None, metavar="TARGET", help="Show saved repository access profiles (all, or details of groupId:artifactId:version) and exit.")
+	argument_parser.add_argument("--clear-profiles", nargs="?", const="", default=None, metavar="TARGET", help="Remove saved repository access profiles (all, or of groupId:artifactId:version) and exit.")
+	argument_parser.add_argument("--daemon", action="store_true", help="Run as build daemon. Keeps the dependency graph in memory and rebuilds requested targets when their sources change.")
+	argument_parser.add_argument("--daemon-build", metavar="TARGET", help="Ask running build daemon to build groupId:artifactId:version.")
+	argument_parser.add_argument("--daemon-status", action="store_true", help="Show status of running build daemon.")
+	argument_parser.add_argument("--batch", nargs="+", default=[], metavar="TARGET", help="Build groupId:artifactId:version targets without asking anything.")
+	argument_parser.add_argument("--batch-file", metavar="FILE", help="Build targets listed in FILE (one groupId:artifactId:version per line) without asking anything.")
+	argument_parser.add_argument("--summary-json", metavar="FILE", help="Save JSON summary of batch build to FILE instead of printing it.")
+	argument_parser.add_argument("--trace", metavar="FILE", help="Record timing spans of the build. Saved as Chrome/Perfetto trace JSON to FILE and as text summary to FILE.txt on exit.")
+	argument_parser.add_argument("--trace-top", type=int, default=20, metavar="N", help="How many entries the trace summary shows.")
+	argument_parser.add_argument("--profile-mapping", action="store_true", help="Run POM mapping under cProfile. Profile is saved to FILE.mapping.prof of --trace.")
+	argument_parser.add_argument("--server-log-level", choices=REPOSITORY_SERVER_LOG_LEVELS, default=REPOSITORY_SERVER_LOG_LEVEL, help="How much the repository server prints.")
+	arguments = argument_parser.parse_args()
+
+	REPOSITORY_SERVER_LOG_LEVEL = arguments.server_log_level
+
+	if arguments.profile_mapping and arguments.trace is None:
+		argument_parser.error("--profile-mapping needs --trace")
+
+	if arguments.trace is not None:
+		tracer.enabled = True
+		if arguments.profile_mapping:
+			tracer.mapping_profiler = cProfile.Profile()
+		atexit.register(tracer.export, arguments.trace, arguments.trace_top)
+
+	if arguments.show_profiles is not None:
+		show_access_profiles(arguments.show_profiles or None)
+	elif arguments.clear_profiles is not None:
+		clear_access_profiles(arguments.clear_profiles or None)
+	elif arguments.daemon_build is not None:
+		print(json.dumps(send_daemon_request({"command": "build", "target": arguments.daemon_build})))
+	elif arguments.daemon_status:
+		print(json.dumps(send_daemon_request({"command": "status"})))
+	elif RUN_AS_REPOSITORY_SERVER: 
+		start_repository_server()
+	elif arguments.batch or arguments.batch_file is not None:
+		try:
+			batch_targets:List[str] = read_batch_targets(arguments.batch, arguments.batch_file)
+		except (ValueError, OSError) as e:
+			argument_parser.error(str(e))
+		server_thread = threading.Thread(target=start_repository_server, daemon=True)
+		server_thread.start()
+		if not run_batch_build(batch_targets, arguments.summary_json):
+			sys.exit(1)
+	elif arguments.daemon:
+		server_thread = threading.Thread(target=start_repository_server, daemon=True)
+		server_thread.start()
+		BuildDaemon().run()
+	else:
+		server_thread = threading.Thread(target=start_repository_server, daemon=True)
+		server_thread.start()
+
+		with tracer.profile_mapping():
+			pom_dir_by_pom_signature:Dict[str, str] = map_pom_paths(MAVEN_PROJECTS_DIRECTORY)
+
+		print("Please enter the information of the POM you want to compile:")
+		pom_group_id:str = input("Group ID: ")
+		pom_artifact_id:str = input("Artifact ID: ")
+		pom_version:str = input("Version Number: ")
+
+		pom_info:PomInfo = create_pom_info(pom_group_id, pom_artifact_id, pom_version, pom_dir_by_pom_signature)
+		build_pom(pom_info, pom_dir_by_pom_signature)
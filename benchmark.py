@@ -0,0 +1,558 @@
+from http.server import HTTPServer, ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple
+from typing import Dict
+from typing import List
+from typing import Any
+
+import urllib.request
+import urllib.error
+import http.client
+import contextlib
+import statistics
+import platform
+import argparse
+import tempfile
+import hashlib
+import random
+import shutil
+import json
+import glob
+import threading
+import time
+import sys
+import os
+
+import auto_build
+from auto_build import Bcolors, color_print
+
+# Benchmark of auto_build.py on a generated alternativa_sources like tree. Maven is replaced with stub_mvn.py and the MAVEN_REPOS with a local stand-in server,
+# so the results only depend on this machine and the code, not on the leak, JDK 1.6 or internet mirrors.
+
+# Results are saved here, unless --output is given.
+BENCHMARK_RESULT_FILE:str = ".\\benchmark_results.json"
+
+# Increase when meaning of saved results changes. Results with other format version are not compared.
+BENCHMARK_FORMAT_VERSION:int = 1
+
+# Results that are this much slower or faster than baseline are highlighted by --compare.
+COMPARE_THRESHOLD = 0.05
+
+STUB_MVN_FILE:str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stub_mvn.py")
+
+# Group ids of the generated tree. They start with LOCAL_DEPENDENCY_IDENTIFIER_PREFIX, so auto_build.py sees them as local.
+BENCHMARK_ROOT_GROUP_ID = "projects.tanks.bench"
+BENCHMARK_GROUP_ID = "platform.bench"
+BENCHMARK_VERSION = "1.0.0.0"
+BENCHMARK_VERSION_RANGE = "[1.0.0.0, 2.0.0.0)"
+
+# Paths containing this are not found from any stand-in mirror.
+MISSING_ARTIFACT_MARKER = "/missing/"
+
+class SyntheticPom:
+	def __init__(self, group_id:str, artifact_id:str, packaging:str = "jar"):
+		self.group_id:str = group_id
+		self.artifact_id:str = artifact_id
+		self.version:str = BENCHMARK_VERSION
+		self.packaging:str = packaging
+		self.dependencies:List[Tuple[str, str, str]] = []
+		self.managed_dependencies:List[Tuple[str, str, str]] = []
+		self.plugins:List[Tuple[str, str, str]] = []
+		self.model_count:int = 0
+
+	def to_xml(self) -> str:
+		def dependency_xml(tag:str, group_id:str, artifact_id:str, version:str) -> str:
+			version_xml:str = f"<version>{version}</version>" if version != "" else ""
+			return f"\t\t\t<{tag}><groupId>{group_id}</groupId><artifactId>{artifact_id}</artifactId>{version_xml}</{tag}>\n"
+
+		xml:str = '<?xml version="1.0" encoding="UTF-8"?>\n'
+		xml += '<project xmlns="http://maven.apache.org/POM/4.0.0" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">\n'
+		xml += "\t<modelVersion>4.0.0</modelVersion>\n"
+		if self.packaging != "pom":
+			xml += f"\t<parent><groupId>{BENCHMARK_GROUP_ID}</groupId><artifactId>BasePom</artifactId><version>{BENCHMARK_VERSION}</version></parent>\n"
+		xml += f"\t<groupId>{self.group_id}</groupId>\n\t<artifactId>{self.artifact_id}</artifactId>\n\t<version>{self.version}</version>\n\t<packaging>{self.packaging}</packaging>\n"
+		xml += "\t<dependencies>\n" + "".join(dependency_xml("dependency", *dependency) for dependency in self.dependencies) + "\t</dependencies>\n"
+		if self.managed_dependencies:
+			xml += "\t<dependencyManagement>\n\t\t<dependencies>\n" + "".join(dependency_xml("dependency", *dependency) for dependency in self.managed_dependencies) + "\t\t</dependencies>\n\t</dependencyManagement>\n"
+		if self.plugins:
+			xml += "\t<build>\n\t\t<plugins>\n" + "".join(dependency_xml("plugin", *plugin) for plugin in self.plugins) + "\t\t</plugins>\n\t</build>\n"
+		xml += "</project>\n"
+		return xml
+
+def generate_synthetic_tree(path:str, pom_count:int, depth:int, fan_out:int, version_range_ratio:float, models_base_count:int, third_party_count:int, files_per_pom:int, file_size:int, seed:int) -> Tuple[str, List[str]]:
+	"""
+	Generate alternativa_sources like tree into path. pom_count modules are split into depth layers and every module depends on fan_out modules of the next layer.
+	Part of dependencies use version ranges, some modules depend on generated ModelsBases and all of them on 3rd party libraries.
+	Returns:
+		Tuple[str, List[str]]: Signature of the root pom and 3rd party repository paths that the tree needs.
+	"""
+
+	rng = random.Random(seed)
+
+	third_party_libraries:List[Tuple[str, str, str]] = [(f"org.bench.thirdparty{i}", f"lib{i}", f"1.{i}.0") for i in range(third_party_count)]
+
+	base_pom = SyntheticPom(BENCHMARK_GROUP_ID, "BasePom", "pom")
+	base_pom.plugins.append(("org.bench.plugins", "bench-maven-plugin", "1.0"))
+
+	layer_sizes:List[int] = [pom_count // depth + (1 if i < pom_count % depth else 0) for i in range(depth)]
+	layers:List[List[SyntheticPom]] = [[SyntheticPom(f"{BENCHMARK_GROUP_ID}.layer{layer}", f"Module{layer}x{i}") for i in range(size)] for layer, size in enumerate(layer_sizes) if size > 0]
+
+	def add_local_dependency(pom:SyntheticPom, dependency:SyntheticPom):
+		version:str = BENCHMARK_VERSION_RANGE if rng.random() < version_range_ratio else dependency.version
+		pom.dependencies.append((dependency.group_id, dependency.artifact_id, version))
+
+	for layer, poms in enumerate(layers[:-1]):
+		next_layer:List[SyntheticPom] = layers[layer + 1]
+		used:set = set()
+		for pom in poms:
+			for dependency in rng.sample(next_layer, min(fan_out, len(next_layer))):
+				add_local_dependency(pom, dependency)
+				used.add(dependency.artifact_id)
+
+		# Every module must be reachable from the root
+		for dependency in next_layer:
+			if dependency.artifact_id not in used:
+				add_local_dependency(rng.choice(poms), dependency)
+
+	# Version of 3rd party library is only in dependencyManagement, like in many of the real poms.
+	for pom in [pom for poms in layers for pom in poms]:
+		for group_id, artifact_id, version in rng.sample(third_party_libraries, min(rng.randint(0, 2), len(third_party_libraries))):
+			pom.dependencies.append((group_id, artifact_id, ""))
+			pom.managed_dependencies.append((group_id, artifact_id, version))
+
+	models_poms:List[SyntheticPom] = []
+	for i in range(models_base_count):
+		models_pom = SyntheticPom(f"{BENCHMARK_GROUP_ID}.server.models{i}", f"Models{i}")
+		models_pom.model_count = rng.randint(5, 30)
+		models_poms.append(models_pom)
+		user:SyntheticPom = rng.choice([pom for poms in layers[:-1] or layers for pom in poms])
+		user.dependencies.append((f"{BENCHMARK_GROUP_ID}.client.models{i}", f"Models{i}ModelsBase", BENCHMARK_VERSION))
+
+	root_pom = SyntheticPom(BENCHMARK_ROOT_GROUP_ID, "Runner")
+	for pom in layers[0]:
+		root_pom.dependencies.append((pom.group_id, pom.artifact_id, pom.version))
+
+	filler:str = "\tpublic void method() { System.out.println(\"benchmark\"); }\n"
+	for pom in [root_pom, base_pom] + models_poms + [pom for poms in layers for pom in poms]:
+		pom_path:str = os.path.join(path, pom.group_id.replace(".", "\\") + "\\" + pom.artifact_id + "\\trunk\\")
+		os.makedirs(pom_path, exist_ok=True)
+		with open(os.path.join(pom_path, "pom.xml"), "w") as f:
+			f.write(pom.to_xml())
+
+		if pom.packaging == "pom":
+			continue
+
+		os.makedirs(os.path.join(pom_path, "src\\main\\java\\"), exist_ok=True)
+		for i in range(files_per_pom):
+			source:str = f"package {pom.group_id};\n\npublic class Class{i} {{\n"
+			source += filler * max(0, (file_size - len(source)) // len(filler)) + "}\n"
+			with open(os.path.join(pom_path, f"src\\main\\java\\Class{i}.java"), "w") as f:
+				f.write(source)
+
+		if pom.model_count > 0:
+			os.makedirs(os.path.join(pom_path, "src\\main\\resources\\"), exist_ok=True)
+			with open(os.path.join(pom_path, "src\\main\\resources\\models.xml"), "w") as f:
+				f.write("<models>\n" + "".join(f'\t<model name="Model{i}" id="{rng.getrandbits(63)}"/>\n' for i in range(pom.model_count)) + "</models>\n")
+
+	third_party_repository_paths:List[str] = [auto_build.create_repository_path(*library, "pom") for library in third_party_libraries]
+	third_party_repository_paths += [auto_build.create_repository_path(*library, "jar") for library in third_party_libraries]
+	return auto_build.create_pom_signature(root_pom.group_id, root_pom.artifact_id, root_pom.version), third_party_repository_paths
+
+def write_stub_maven(directory:str, seconds:float) -> str:
+	"""Write batch file that runs stub_mvn.py instead of maven. Returns path of the batch file."""
+	script_path:str = os.path.join(directory, "stub_mvn.bat")
+	with open(script_path, "w") as f:
+		f.write(f'@"{sys.executable}" "{STUB_MVN_FILE}" {seconds} %*\n')
+	return script_path
+
+class StubUpstreamRequestHandler(BaseHTTPRequestHandler):
+	"""
+	Stand-in for the mirrors in MAVEN_REPOS. Every mirror is served from its own path prefix (/mirror0/, /mirror1/, ...).
+	Every mirror except the last one answers 404 to not_found_rate of the paths, so the fallthrough to the next mirror is measured too.
+	"""
+
+	latency:float = 0.0
+	not_found_rate:float = 0.0
+	mirror_count:int = 1
+
+	def log_message(self, format, *args):
+		pass
+
+	def is_found(self) -> bool:
+		if MISSING_ARTIFACT_MARKER in self.path:
+			return False
+
+		mirror:str = self.path.split("/")[1]
+		if mirror == "mirror" + str(self.mirror_count - 1):
+			return True
+
+		# Same path is always found or not found from the same mirror.
+		return hashlib.sha256(self.path.encode("utf-8")).digest()[0] / 256 >= self.not_found_rate
+
+	def do_GET(self):
+		time.sleep(self.latency)
+
+		if not self.is_found():
+			self.send_response(404)
+			self.end_headers()
+			return
+
+		# /mirror0/group/path/artifact/version/artifact-version.pom
+		path_parts:List[str] = self.path.split("/", 2)[-1].rsplit("/", 3)
+		if self.path.endswith(".pom") and len(path_parts) == 4:
+			group_path, artifact_id, version_ = path_parts[:3]
+			body:bytes = f"""<?xml version="1.0" encoding="UTF-8"?>
+<project><modelVersion>4.0.0</modelVersion><groupId>{group_path.replace("/", ".")}</groupId><artifactId>{artifact_id}</artifactId><version>{version_}</version><packaging>jar</packaging></project>
+""".encode("utf-8")
+		else:
+			body = hashlib.sha256(self.path.encode("utf-8")).digest() * 1024
+
+		self.send_response(200)
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+def start_stub_upstream(latency:float, not_found_rate:float, mirror_count:int) -> Tuple[ThreadingHTTPServer, List[str]]:
+	"""Start stand-in upstream server in background. Returns the server and urls of its mirrors."""
+	StubUpstreamRequestHandler.latency = latency
+	StubUpstreamRequestHandler.not_found_rate = not_found_rate
+	StubUpstreamRequestHandler.mirror_count = mirror_count
+
+	httpd = ThreadingHTTPServer(("localhost", 0), StubUpstreamRequestHandler)
+	threading.Thread(target=httpd.serve_forever, daemon=True).start()
+	return httpd, [f"http://localhost:{httpd.server_address[1]}/mirror{i}/" for i in range(mirror_count)]
+
+@contextlib.contextmanager
+def quiet():
+	"""Hide output of auto_build.py, so that printing to console is not measured."""
+	with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+		yield
+
+def summarize(durations:List[float]) -> Dict[str, Any]:
+	return {"min": min(durations), "median": statistics.median(durations), "max": max(durations), "runs": durations}
+
+def measure(function, repeat:int, setup = None) -> Tuple[Dict[str, Any], Any]:
+	"""
+	Run setup (not measured) and function repeat times.
+	Returns:
+		Tuple[Dict[str, Any], Any]: Durations in seconds and return value of the last run of function.
+	"""
+	durations:List[float] = []
+	result:Any = None
+	for _ in range(repeat):
+		with quiet():
+			if setup is not None:
+				setup()
+			start_time:float = time.perf_counter()
+			result = function()
+			durations.append(time.perf_counter() - start_time)
+	return summarize(durations), result
+
+def remove_directory(path:str):
+	if os.path.exists(path):
+		shutil.rmtree(path, onerror=auto_build.remove_readonly)
+
+def remove_hash_files():
+	for path in glob.glob(".\\.hash_files\\*"):
+		if os.path.isdir(path):
+			remove_directory(path)
+		else:
+			os.remove(path)
+
+def reset_build_state():
+	"""Forget everything that auto_build.py remembers between builds, like a new process would."""
+	auto_build.files_changed_in_directory_already_checked.clear()
+	auto_build.file_hash_manager = auto_build.FileHashManager()
+	auto_build.build_history = auto_build.BuildHistory(auto_build.BUILD_HISTORY_FILE)
+
+def remove_build_results():
+	"""Remove everything that a build leaves behind, so that the next build starts from scratch. Downloaded 3rd party artifacts are removed too."""
+	for path in [auto_build.LOCAL_REPOSITORY_DIRECTORY, auto_build.COMPILATION_WORK_DIRECTORY, auto_build.MODELS_BASE_CACHE_DIRECTORY]:
+		remove_directory(path)
+	remove_hash_files()
+	if os.path.exists(auto_build.BUILD_HISTORY_FILE):
+		os.remove(auto_build.BUILD_HISTORY_FILE)
+	reset_build_state()
+
+def map_root(root_signature:str, pom_dir_by_pom_signature:Dict[str, str]) -> Tuple[auto_build.PomInfo, Dict[str, auto_build.PomInfo]]:
+	group_id, artifact_id, version_ = root_signature.split(":")
+	root_pom_info:auto_build.PomInfo = auto_build.create_pom_info(group_id, artifact_id, version_, pom_dir_by_pom_signature)
+	return root_pom_info, auto_build.map_pom_dependencies(root_pom_info, pom_dir_by_pom_signature)
+
+def benchmark_mapping(root_signature:str, repeat:int) -> Tuple[Dict[str, Any], Dict[str, str]]:
+	results:Dict[str, Any] = {}
+
+	results["map_pom_paths"], pom_dir_by_pom_signature = measure(lambda: auto_build.map_pom_paths(auto_build.MAVEN_PROJECTS_DIRECTORY), repeat)
+	results["map_pom_paths"]["poms"] = len(pom_dir_by_pom_signature)
+
+	results["map_pom_dependencies"], (_, pom_info_by_pom_signature) = measure(lambda: map_root(root_signature, pom_dir_by_pom_signature), repeat)
+	results["map_pom_dependencies"]["poms"] = len(pom_info_by_pom_signature)
+	results["map_pom_dependencies"]["edges"] = sum(len(pom_info.dependencies) for pom_info in pom_info_by_pom_signature.values())
+
+	return results, pom_dir_by_pom_signature
+
+def benchmark_file_hash_manager(pom_dir_by_pom_signature:Dict[str, str], repeat:int) -> Dict[str, Any]:
+	"""Hash every project directory without saved hashes (first build) and with unchanged saved hashes (next builds)."""
+	results:Dict[str, Any] = {}
+	directories:List[str] = list(pom_dir_by_pom_signature.values())
+	hashed_bytes:int = sum(os.path.getsize(os.path.join(root, filename)) for directory in directories for root, _, filenames in os.walk(directory) for filename in filenames)
+
+	def check_all_directories() -> int:
+		file_hash_manager = auto_build.FileHashManager()
+		return len([directory for directory in directories if file_hash_manager.files_changed_in_directory(directory)])
+
+	results["file_hash_manager_cold"], changed_count = measure(check_all_directories, repeat, remove_hash_files)
+	results["file_hash_manager_cold"]["changed_directories"] = changed_count
+
+	results["file_hash_manager_warm"], changed_count = measure(check_all_directories, repeat)
+	results["file_hash_manager_warm"]["changed_directories"] = changed_count
+
+	for result in results.values():
+		result["directories"] = len(directories)
+		result["bytes"] = hashed_bytes
+		result["megabytes_per_second"] = hashed_bytes / result["median"] / 1024 / 1024
+	return results
+
+def benchmark_compilation(root_signature:str, pom_dir_by_pom_signature:Dict[str, str], repeat:int) -> Dict[str, Any]:
+	"""
+	Build the root pom from scratch, then again without changes twice and once more after one source file has changed.
+	Hashes of compiled modules are saved only when they are checked, so the second build hashes every module and the third one shows the fully cached case.
+	"""
+	results:Dict[str, Any] = {}
+	build_summary:List[auto_build.BuildSummary] = []
+
+	def compile_root() -> Tuple[bool, float]:
+		root_pom_info, pom_info_by_pom_signature = map_root(root_signature, pom_dir_by_pom_signature)
+		build_summary.append(auto_build.BuildSummary())
+		start_time:float = time.perf_counter()
+		success:bool = auto_build.compile_pom_and_its_dependencies(root_pom_info, pom_info_by_pom_signature, None, build_summary[-1])
+		# Mapping is measured by benchmark_mapping
+		return success, time.perf_counter() - start_time
+
+	# Source file of a module without dependents of its own
+	leaf_pom_dir:str = sorted(pom_dir for pom_signature, pom_dir in pom_dir_by_pom_signature.items() if ".layer" in pom_signature)[-1]
+	changed_source_path:str = os.path.join(leaf_pom_dir, "src\\main\\java\\Class0.java")
+
+	def change_one_source_file():
+		reset_build_state()
+		with open(changed_source_path, "a") as f:
+			f.write("// changed\n")
+
+	for name, setup in [("compile_cold", remove_build_results), ("compile_second", reset_build_state), ("compile_no_changes", reset_build_state), ("compile_one_changed", change_one_source_file)]:
+		durations:List[float] = []
+		for _ in range(repeat):
+			with quiet():
+				setup()
+				success, duration = compile_root()
+			durations.append(duration)
+		results[name] = summarize(durations)
+		results[name]["success"] = success
+		results[name].update({key: len(signatures) for key, signatures in build_summary[-1].to_json().items()})
+	return results
+
+def benchmark_repository_server(request_paths:List[str], request_count:int, client_count:int) -> Dict[str, Any]:
+	"""Send request_count requests from client_count clients at the same time to the repository server, like maven with parallel downloads would."""
+	httpd = HTTPServer(("localhost", 0), auto_build.RepositoryRequestHandler)
+	threading.Thread(target=httpd.serve_forever, daemon=True).start()
+	server_url:str = f"http://localhost:{httpd.server_address[1]}"
+
+	errors:List[str] = []
+
+	def request(path:str) -> float:
+		start_time:float = time.perf_counter()
+		try:
+			with urllib.request.urlopen(server_url + path) as response:
+				response.read()
+		except urllib.error.HTTPError:
+			# 404 is a normal answer
+			pass
+		except (urllib.error.URLError, http.client.HTTPException, ConnectionError):
+			errors.append(path)
+		return time.perf_counter() - start_time
+
+	# Every path once before measuring, so that upstream downloads are not included.
+	with quiet(), ThreadPoolExecutor(client_count) as executor:
+		list(executor.map(request, request_paths))
+
+	errors.clear()
+	requests_before:Dict[str, int] = auto_build.repository_metrics.snapshot()["requests"]
+	paths:List[str] = [request_paths[i % len(request_paths)] for i in range(request_count)]
+	with quiet(), ThreadPoolExecutor(client_count) as executor:
+		start_time:float = time.perf_counter()
+		latencies:List[float] = list(executor.map(request, paths))
+		duration:float = time.perf_counter() - start_time
+	requests_after:Dict[str, int] = auto_build.repository_metrics.snapshot()["requests"]
+
+	httpd.shutdown()
+	httpd.server_close()
+
+	latencies.sort()
+	return {"repository_server": {
+		"min": duration,
+		"median": duration,
+		"max": duration,
+		"runs": [duration],
+		"requests": request_count,
+		"clients": client_count,
+		"requests_per_second": request_count / duration,
+		"errors": len(errors),
+		"latency_p50": latencies[len(latencies) // 2],
+		"latency_p95": latencies[int(len(latencies) * 0.95)],
+		"latency_p99": latencies[int(len(latencies) * 0.99)],
+		"requests_by_outcome": {outcome: requests_after[outcome] - requests_before[outcome] for outcome in requests_after},
+	}}
+
+def collect_server_request_paths(third_party_repository_paths:List[str]) -> List[str]:
+	"""Mix of requests that maven makes during a build: local artifacts, their checksums, generated metadata, 3rd party artifacts and artifacts that don't exist anywhere."""
+	paths:List[str] = []
+	for root, _, filenames in os.walk(auto_build.LOCAL_REPOSITORY_DIRECTORY):
+		for filename in filenames:
+			repository_path:str = "/".join(part for part in os.path.relpath(os.path.join(root, filename), auto_build.LOCAL_REPOSITORY_DIRECTORY).replace("\\", "/").replace(os.sep, "/").split("/") if part != "")
+			if not repository_path.startswith(BENCHMARK_GROUP_ID.replace(".", "/")) or repository_path.endswith(".part"):
+				continue
+			paths.append("/" + repository_path)
+			paths.append("/" + repository_path + ".sha1")
+			paths.append("/" + repository_path.rsplit("/", 2)[0] + "/maven-metadata.xml")
+
+	paths += ["/" + repository_path for repository_path in third_party_repository_paths]
+	paths += [f"/org/bench{MISSING_ARTIFACT_MARKER}lib{i}/1.0/lib{i}-1.0.pom" for i in range(max(1, len(paths) // 20))]
+	return sorted(set(paths))
+
+def find_problems(results:Dict[str, Any]) -> List[str]:
+	"""Reasons why results don't measure a working build. Such results are not comparable with other runs."""
+	problems:List[str] = []
+	for name, result in results.items():
+		if name.startswith("compile_") and not result["success"]:
+			problems.append(name + " failed")
+
+	repository_server:Dict[str, Any] = results["repository_server"]
+	if repository_server["errors"] > 0:
+		problems.append("repository_server had " + str(repository_server["errors"]) + " failed requests")
+	if repository_server["requests_by_outcome"]["local_hit"] == 0:
+		problems.append("repository_server didn't find any compiled artifact from the local repository")
+	return problems
+
+def compare_results(results:Dict[str, Any], baseline:Dict[str, Any]):
+	if baseline.get("format_version") != BENCHMARK_FORMAT_VERSION:
+		color_print(Bcolors.WARNING, "Baseline has different format version, results are not compared.")
+		return
+	if baseline.get("problems"):
+		color_print(Bcolors.FAIL, "Baseline is not comparable: " + "; ".join(baseline["problems"]))
+		return
+	if baseline["parameters"] != results["parameters"]:
+		color_print(Bcolors.WARNING, "Baseline was run with different parameters, comparison may be meaningless.")
+
+	for name, result in results["results"].items():
+		if name not in baseline["results"]:
+			continue
+		baseline_median:float = baseline["results"][name]["median"]
+		change:float = (result["median"] - baseline_median) / baseline_median if baseline_median > 0 else 0.0
+		bcolor:str = Bcolors.ENDC
+		if change > COMPARE_THRESHOLD:
+			bcolor = Bcolors.FAIL
+		elif change < -COMPARE_THRESHOLD:
+			bcolor = Bcolors.OKGREEN
+		color_print(bcolor, f"{name:<24} {baseline_median:10.4f} s -> {result['median']:10.4f} s {change:+8.1%}")
+
+def run_benchmarks(arguments:argparse.Namespace) -> Dict[str, Any]:
+	parameters:Dict[str, Any] = {key: value for key, value in vars(arguments).items() if key not in ["output", "compare", "workspace", "keep_workspace"]}
+	results:Dict[str, Any] = {}
+
+	auto_build.REPOSITORY_SERVER_LOG_LEVEL = "quiet"
+	auto_build.OFFLINE_MODE = False
+
+	upstream_server, auto_build.MAVEN_REPOS = start_stub_upstream(arguments.upstream_latency, arguments.upstream_404_rate, arguments.upstream_mirrors)
+	auto_build.MAVEN_EXECUTABLE = write_stub_maven(os.getcwd(), arguments.maven_seconds)
+
+	color_print(Bcolors.OKGREEN, "Generating synthetic tree to " + os.path.abspath(auto_build.MAVEN_PROJECTS_DIRECTORY))
+	remove_directory(auto_build.MAVEN_PROJECTS_DIRECTORY)
+	root_signature, third_party_repository_paths = generate_synthetic_tree(auto_build.MAVEN_PROJECTS_DIRECTORY, arguments.pom_count, arguments.depth, arguments.fan_out, arguments.version_range_ratio, arguments.models_base_count, arguments.third_party_count, arguments.files_per_pom, arguments.file_size, arguments.seed)
+
+	color_print(Bcolors.OKGREEN, "Mapping")
+	mapping_results, pom_dir_by_pom_signature = benchmark_mapping(root_signature, arguments.repeat)
+	results.update(mapping_results)
+
+	color_print(Bcolors.OKGREEN, "Hashing")
+	results.update(benchmark_file_hash_manager(pom_dir_by_pom_signature, arguments.repeat))
+
+	color_print(Bcolors.OKGREEN, "Compiling")
+	results.update(benchmark_compilation(root_signature, pom_dir_by_pom_signature, arguments.build_repeat))
+
+	color_print(Bcolors.OKGREEN, "Repository server")
+	results.update(benchmark_repository_server(collect_server_request_paths(third_party_repository_paths), arguments.server_requests, arguments.server_clients))
+
+	upstream_server.shutdown()
+
+	return {
+		"format_version": BENCHMARK_FORMAT_VERSION,
+		"timestamp": time.time(),
+		"python": sys.version,
+		"platform": platform.platform(),
+		"cpu_count": os.cpu_count(),
+		"parameters": parameters,
+		"problems": find_problems(results),
+		"results": results,
+	}
+
+if __name__ == "__main__":
+	argument_parser = argparse.ArgumentParser(description="Benchmark auto_build.py on a generated tree with stub maven and stand-in upstream mirrors.")
+	argument_parser.add_argument("--pom-count", type=int, default=200, help="How many modules the generated tree has (root, BasePom and ModelsBase generators not included).")
+	argument_parser.add_argument("--depth", type=int, default=6, help="How many layers of modules depend on each other.")
+	argument_parser.add_argument("--fan-out", type=int, default=3, help="How many modules of the next layer every module depends on.")
+	argument_parser.add_argument("--version-range-ratio", type=float, default=0.2, help="Part of local dependencies that use version range instead of exact version.")
+	argument_parser.add_argument("--models-base-count", type=int, default=5, help="How many modules generate ModelsBase.")
+	argument_parser.add_argument("--third-party-count", type=int, default=30, help="How many 3rd party libraries the modules depend on.")
+	argument_parser.add_argument("--files-per-pom", type=int, default=10, help="How many source files every module has.")
+	argument_parser.add_argument("--file-size", type=int, default=4096, help="Size of every source file in bytes.")
+	argument_parser.add_argument("--seed", type=int, default=1, help="Seed of the generated tree. Same seed and parameters generate the same tree.")
+	argument_parser.add_argument("--maven-seconds", type=float, default=0.0, help="How long stub maven sleeps on every run.")
+	argument_parser.add_argument("--upstream-latency", type=float, default=0.02, help="Seconds that stand-in mirrors wait before answering.")
+	argument_parser.add_argument("--upstream-404-rate", type=float, default=0.3, help="Part of paths that every stand-in mirror except the last one doesn't have.")
+	argument_parser.add_argument("--upstream-mirrors", type=int, default=3, help="How many stand-in mirrors MAVEN_REPOS has.")
+	argument_parser.add_argument("--repeat", type=int, default=5, help="How many times mapping and hashing are measured.")
+	argument_parser.add_argument("--build-repeat", type=int, default=1, help="How many times every compilation scenario is measured.")
+	argument_parser.add_argument("--server-requests", type=int, default=2000, help="How many requests are sent to the repository server.")
+	argument_parser.add_argument("--server-clients", type=int, default=4, help="How many clients send requests to the repository server at the same time.")
+	argument_parser.add_argument("--workspace", help="Directory where the tree is generated and built. Temporary directory by default.")
+	argument_parser.add_argument("--keep-workspace", action="store_true", help="Don't remove the temporary workspace.")
+	argument_parser.add_argument("--output", default=BENCHMARK_RESULT_FILE, help="Where results are saved as JSON.")
+	argument_parser.add_argument("--compare", help="Results JSON of earlier run to compare with.")
+	arguments = argument_parser.parse_args()
+
+	# auto_build.py builds its paths with "\\", on other systems local repository lookups miss and results would be meaningless.
+	if os.name != "nt":
+		color_print(Bcolors.FAIL, "Benchmark runs only on Windows, like auto_build.py.")
+		sys.exit(1)
+
+	output_path:str = os.path.abspath(arguments.output)
+	baseline_path:None | str = os.path.abspath(arguments.compare) if arguments.compare else None
+	workspace:str = os.path.abspath(arguments.workspace) if arguments.workspace else tempfile.mkdtemp(prefix="auto_build_benchmark_")
+	os.makedirs(workspace, exist_ok=True)
+
+	original_directory:str = os.getcwd()
+	# Paths in auto_build.py are relative, so everything it creates goes into workspace.
+	os.chdir(workspace)
+	try:
+		benchmark_results:Dict[str, Any] = run_benchmarks(arguments)
+	finally:
+		os.chdir(original_directory)
+		if not arguments.workspace and not arguments.keep_workspace:
+			remove_directory(workspace)
+
+	with open(output_path, "w") as f:
+		json.dump(benchmark_results, f, indent=2)
+
+	for name, result in benchmark_results["results"].items():
+		print(f"{name:<24} median {result['median']:10.4f} s  min {result['min']:10.4f} s")
+
+	if benchmark_results["problems"]:
+		for problem in benchmark_results["problems"]:
+			color_print(Bcolors.FAIL, "PROBLEM: " + problem)
+		color_print(Bcolors.FAIL, "Results are NOT comparable. They were saved to " + output_path + " marked with the problems above.")
+		sys.exit(1)
+
+	color_print(Bcolors.OKGREEN, "Results saved to " + output_path)
+
+	if baseline_path is not None:
+		with open(baseline_path, "r") as f:
+			compare_results(benchmark_results, json.load(f))
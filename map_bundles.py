@@ -1,32 +1,409 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple
+from typing import Dict
 from typing import List
+from typing import Any
 
 import zipfile
+import json
+import sys
 import os
 
 DIR:str = "C:\\Users\\juho\\Documents\\tankin_modaus\\romut\\alternativa_projects\\auto_build\\local_repository\\"
 
-def is_osgi_bundle(jar_path:str):
+# Parsed manifests of all jars under DIR. Only new or changed jars are opened again on the next run.
+INDEX_FILE:str = ".\\.bundle_index.json"
+
+# Increase when stored bundle info changes. Index with other format version is built again.
+INDEX_FORMAT_VERSION:int = 3
+
+# How many jars are read at the same time.
+WORKER_COUNT:int = 8
+
+# Packages that the system bundle (Java 6 JRE + Equinox framework) exports. Subpackages are included. Imports of these are resolved by the system bundle
+# only if no bundle exports the package at all. Add packages here if the target JRE provides more.
+SYSTEM_PACKAGES:List[str] = [
+	"java",
+	"javax.accessibility",
+	"javax.activation",
+	"javax.activity",
+	"javax.annotation",
+	"javax.crypto",
+	"javax.imageio",
+	"javax.jws",
+	"javax.lang.model",
+	"javax.management",
+	"javax.naming",
+	"javax.net",
+	"javax.print",
+	"javax.rmi",
+	"javax.script",
+	"javax.security.auth",
+	"javax.security.cert",
+	"javax.security.sasl",
+	"javax.sound",
+	"javax.sql",
+	"javax.swing",
+	"javax.tools",
+	"javax.transaction.xa",
+	"javax.xml",
+	"org.ietf.jgss",
+	"org.omg",
+	"org.w3c.dom",
+	"org.xml.sax",
+	"org.osgi.framework",
+	"org.osgi.service.condpermadmin",
+	"org.osgi.service.packageadmin",
+	"org.osgi.service.permissionadmin",
+	"org.osgi.service.startlevel",
+	"org.osgi.service.url",
+	"org.osgi.util.tracker",
+	"sun",
+	"com.sun",
+]
+
+def split_outside_quotes(value:str, separator:str) -> List[str]:
+	"""Split manifest header value by separator, but not inside quoted strings. For example version ranges like "[1.0,2.0)" contain commas."""
+	parts:List[str] = []
+	current:str = ""
+	in_quotes:bool = False
+	for char in value:
+		if char == "\"":
+			in_quotes = not in_quotes
+		if char == separator and not in_quotes:
+			parts.append(current)
+			current = ""
+			continue
+		current += char
+	parts.append(current)
+	return [part.strip() for part in parts if part.strip() != ""]
+
+def parse_header_clauses(value:str) -> List[Dict[str, Any]]:
+	"""
+	Parse OSGi header like Export-Package or Import-Package.
+	Returns list of {"name": ..., "attributes": {...}, "directives": {...}}. Clause with many names (a;b;version=1.0) is returned once for every name.
+	"""
+	clauses:List[Dict[str, Any]] = []
+	for clause in split_outside_quotes(value, ","):
+		names:List[str] = []
+		attributes:Dict[str, str] = {}
+		directives:Dict[str, str] = {}
+		for part in split_outside_quotes(clause, ";"):
+			if ":=" in part:
+				key, parameter_value = part.split(":=", 1)
+				directives[key.strip()] = parameter_value.strip().strip("\"")
+			elif "=" in part:
+				key, parameter_value = part.split("=", 1)
+				attributes[key.strip()] = parameter_value.strip().strip("\"")
+			else:
+				names.append(part)
+		for name in names:
+			clauses.append({"name": name, "attributes": attributes, "directives": directives})
+	return clauses
+
+def parse_manifest(manifest:bytes) -> Dict[str, str]:
+	"""
+	Parse META-INF/MANIFEST.MF main section. Lines starting with a space continue the previous line.
+	Lines are wrapped at 72 bytes, which can split UTF-8 characters, so lines are joined before decoding.
+	"""
+	header_lines:List[bytes] = []
+	for line in manifest.splitlines():
+		if line.startswith(b" "):
+			if header_lines:
+				header_lines[-1] += line[1:]
+			continue
+
+		if line.strip() == b"":
+			# Main section ends at the first empty line
+			if header_lines:
+				break
+			continue
+
+		header_lines.append(line)
+
+	headers:Dict[str, str] = {}
+	for header_line in header_lines:
+		line = header_line.decode("utf-8", errors="replace")
+		if ":" not in line:
+			continue
+
+		header_name, header_value = line.split(":", 1)
+		headers[header_name] = header_value[1:] if header_value.startswith(" ") else header_value
+	return headers
+
+def read_bundle_info(jar_path:str) -> None | Dict[str, Any]:
+	"""
+	Read OSGi headers from jar. Only the zip central directory and the manifest entry are read.
+	Returns:
+		None | Dict[str, Any]: None if jar is not an OSGi bundle.
+	"""
 	try:
 		with zipfile.ZipFile(jar_path, "r") as jar:
-			# Read the manifest file
-			manifest = jar.read("META-INF/MANIFEST.MF").decode("utf-8", errors="replace")
-			# Check for the OSGi bundle header
-			return "Bundle-SymbolicName:" in manifest
+			manifest:bytes = jar.read("META-INF/MANIFEST.MF")
 	except Exception:
 		# Skip jars without a proper manifest or if any error occurs
+		return None
+
+	headers:Dict[str, str] = parse_manifest(manifest)
+	if "Bundle-SymbolicName" not in headers:
+		return None
+
+	symbolic_name_clauses:List[Dict[str, Any]] = parse_header_clauses(headers["Bundle-SymbolicName"])
+	if not symbolic_name_clauses:
+		return None
+
+	return {
+		"symbolic_name": symbolic_name_clauses[0]["name"],
+		"symbolic_name_directives": symbolic_name_clauses[0]["directives"],
+		"version": headers.get("Bundle-Version", "0.0.0").strip(),
+		"export_package": parse_header_clauses(headers.get("Export-Package", "")),
+		"import_package": parse_header_clauses(headers.get("Import-Package", "")),
+		"require_bundle": parse_header_clauses(headers.get("Require-Bundle", "")),
+		"fragment_host": parse_header_clauses(headers.get("Fragment-Host", "")),
+	}
+
+def load_index(index_file_path:str) -> Dict[str, Dict[str, Any]]:
+	if not os.path.exists(index_file_path):
+		return {}
+	try:
+		with open(index_file_path, "r") as f:
+			index_file = json.load(f)
+	except (OSError, ValueError):
+		return {}
+
+	if not isinstance(index_file, dict) or index_file.get("format_version") != INDEX_FORMAT_VERSION:
+		return {}
+	return index_file["jars"]
+
+def save_index(index:Dict[str, Dict[str, Any]], index_file_path:str):
+	with open(index_file_path, "w") as f:
+		json.dump({"format_version": INDEX_FORMAT_VERSION, "jars": index}, f, indent=1, sort_keys=True)
+
+def index_bundle_jars(root_dir:str, index_file_path:str = INDEX_FILE) -> Dict[str, Dict[str, Any]]:
+	"""
+	Index all jars under root_dir. Jars whose size and modification time are same as in the saved index are not opened.
+	Returns:
+		Dict[str, Dict[str, Any]]: {jar_path: {"size": ..., "mtime": ..., "bundle": None | bundle info}}
+	"""
+	old_index:Dict[str, Dict[str, Any]] = load_index(index_file_path)
+	index:Dict[str, Dict[str, Any]] = {}
+	changed_jar_paths:List[str] = []
+
+	for dirpath, _, filenames in os.walk(root_dir):
+		for filename in filenames:
+			if not filename.lower().endswith(".jar"):
+				continue
+
+			jar_path:str = os.path.join(dirpath, filename)
+			jar_stat = os.stat(jar_path)
+			old_entry:None | Dict[str, Any] = old_index.get(jar_path)
+			if old_entry is not None and old_entry["size"] == jar_stat.st_size and old_entry["mtime"] == jar_stat.st_mtime_ns:
+				index[jar_path] = old_entry
+				continue
+
+			index[jar_path] = {"size": jar_stat.st_size, "mtime": jar_stat.st_mtime_ns, "bundle": None}
+			changed_jar_paths.append(jar_path)
+
+	# Reading jars is mostly waiting for disk and zlib, so threads are enough.
+	with ThreadPoolExecutor(max_workers=WORKER_COUNT) as executor:
+		for jar_path, bundle_info in zip(changed_jar_paths, executor.map(read_bundle_info, changed_jar_paths)):
+			index[jar_path]["bundle"] = bundle_info
+
+	print("Indexed " + str(len(index)) + " jars, " + str(len(changed_jar_paths)) + " new or changed.", file=sys.stderr)
+
+	if index != old_index:
+		save_index(index, index_file_path)
+	return index
+
+def parse_osgi_version(version_str:str) -> Tuple[int, int, int, str]:
+	"""Parse OSGi version major.minor.micro.qualifier. Missing or invalid numbers are 0."""
+	parts:List[str] = version_str.strip().split(".", 3)
+	numbers:List[int] = []
+	for part in parts[:3]:
+		try:
+			numbers.append(int(part))
+		except ValueError:
+			numbers.append(0)
+	while len(numbers) < 3:
+		numbers.append(0)
+	qualifier:str = parts[3] if len(parts) > 3 else ""
+	return (numbers[0], numbers[1], numbers[2], qualifier)
+
+def osgi_version_in_range(version_str:str, version_range:None | str) -> bool:
+	"""
+	Check if version is inside OSGi version range like [1.0,2.0). Range without brackets means "at least".
+	Raises ValueError if the range is malformed, for example [2.4].
+	"""
+	if version_range is None or version_range.strip() == "":
+		return True
+
+	version_range = version_range.strip()
+	osgi_version = parse_osgi_version(version_str)
+	if version_range[0] not in "[(":
+		return osgi_version >= parse_osgi_version(version_range)
+
+	bounds:List[str] = version_range[1:-1].split(",")
+	if len(bounds) != 2 or version_range[-1] not in "])":
+		raise ValueError("Malformed version range: " + version_range)
+
+	minimum_str, maximum_str = bounds
+	minimum = parse_osgi_version(minimum_str)
+	maximum = parse_osgi_version(maximum_str)
+	above_minimum:bool = osgi_version >= minimum if version_range[0] == "[" else osgi_version > minimum
+	below_maximum:bool = osgi_version <= maximum if version_range[-1] == "]" else osgi_version < maximum
+	return above_minimum and below_maximum
+
+def is_valid_version_range(version_range:None | str) -> bool:
+	try:
+		osgi_version_in_range("0.0.0", version_range)
+	except ValueError:
 		return False
+	return True
+
+def is_system_package(package_name:str) -> bool:
+	return any(package_name == system_package or package_name.startswith(system_package + ".") for system_package in SYSTEM_PACKAGES)
+
+def is_optional(clause:Dict[str, Any]) -> bool:
+	return clause["directives"].get("resolution") == "optional"
+
+class BundleResolution:
+	def __init__(self):
+		# Jar paths of selected bundles in the order they should be installed.
+		self.install_order:List[str] = []
+		# Symbolic names of bundles that should be started. Fragments are not started.
+		self.start_order:List[str] = []
+		# Jar paths of bundles that were not selected, because other version of the same symbolic name was.
+		self.duplicates:List[str] = []
+		# "symbolic_name: Import-Package name" or "symbolic_name: Require-Bundle name" that nothing provides.
+		self.unresolved:List[str] = []
+
+def select_bundles(index:Dict[str, Dict[str, Any]], resolution:BundleResolution) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+	"""Pick highest version of every symbolic name. Returns {symbolic_name: (jar_path, bundle_info)}."""
+	selected:Dict[str, Tuple[str, Dict[str, Any]]] = {}
+	for jar_path in sorted(index):
+		bundle_info:None | Dict[str, Any] = index[jar_path]["bundle"]
+		if bundle_info is None:
+			continue
+
+		symbolic_name:str = bundle_info["symbolic_name"]
+		if symbolic_name not in selected:
+			selected[symbolic_name] = (jar_path, bundle_info)
+			continue
+
+		if parse_osgi_version(bundle_info["version"]) > parse_osgi_version(selected[symbolic_name][1]["version"]):
+			resolution.duplicates.append(selected[symbolic_name][0])
+			selected[symbolic_name] = (jar_path, bundle_info)
+		else:
+			resolution.duplicates.append(jar_path)
+	return selected
+
+def resolve_bundles(index:Dict[str, Dict[str, Any]]) -> BundleResolution:
+	"""
+	Resolve Import-Package, Require-Bundle and Fragment-Host of the indexed bundles against each other.
+	Bundles are ordered so that every bundle is installed after the bundles it depends on.
+	"""
+	resolution = BundleResolution()
+	selected:Dict[str, Tuple[str, Dict[str, Any]]] = select_bundles(index, resolution)
+
+	# Package name -> [(package version, symbolic name of exporting bundle)]
+	exporters_by_package:Dict[str, List[Tuple[str, str]]] = {}
+	for symbolic_name, (_, bundle_info) in selected.items():
+		for export in bundle_info["export_package"]:
+			exporters_by_package.setdefault(export["name"], []).append((export["attributes"].get("version", "0.0.0"), symbolic_name))
+
+	dependencies_by_bundle:Dict[str, List[str]] = {}
+	for symbolic_name, (_, bundle_info) in selected.items():
+		dependencies:List[str] = []
+		exported_packages:List[str] = [export["name"] for export in bundle_info["export_package"]]
+
+		for package_import in bundle_info["import_package"]:
+			package_name:str = package_import["name"]
+			if package_name in exported_packages:
+				continue
+
+			version_range:None | str = package_import["attributes"].get("version", package_import["attributes"].get("specification-version"))
+			unresolved_import:str = symbolic_name + ": Import-Package " + package_name + ("" if version_range is None else ";version=\"" + version_range + "\"")
+			if not is_valid_version_range(version_range):
+				resolution.unresolved.append(unresolved_import + " (malformed version range)")
+				continue
+
+			all_exporters:List[Tuple[str, str]] = exporters_by_package.get(package_name, [])
+			exporters:List[Tuple[str, str]] = [exporter for exporter in all_exporters if osgi_version_in_range(exporter[0], version_range)]
+			if exporters:
+				dependencies.append(max(exporters, key=lambda exporter: parse_osgi_version(exporter[0]))[1])
+				continue
+
+			# Optional imports are left unwired by the framework, whatever the exported versions are.
+			if is_optional(package_import):
+				continue
+
+			# Some bundle exports the package, but not in the wanted version. System bundle doesn't help with that.
+			if all_exporters:
+				resolution.unresolved.append(unresolved_import + " (exported only in versions " + ", ".join(sorted(set(exporter[0] for exporter in all_exporters))) + ")")
+				continue
+
+			if is_system_package(package_name):
+				continue
+			resolution.unresolved.append(unresolved_import)
+
+		for required_bundle in bundle_info["require_bundle"] + bundle_info["fragment_host"]:
+			required_name:str = required_bundle["name"]
+			if required_name in ["system.bundle", "org.eclipse.osgi"] and required_name not in selected:
+				continue
+
+			version_range = required_bundle["attributes"].get("bundle-version")
+			if not is_valid_version_range(version_range):
+				resolution.unresolved.append(symbolic_name + ": Require-Bundle " + required_name + ";bundle-version=\"" + str(version_range) + "\" (malformed version range)")
+				continue
+
+			if required_name in selected and osgi_version_in_range(selected[required_name][1]["version"], version_range):
+				dependencies.append(required_name)
+				continue
+
+			if is_optional(required_bundle):
+				continue
+			resolution.unresolved.append(symbolic_name + ": Require-Bundle " + required_name + ("" if version_range is None else ";bundle-version=\"" + version_range + "\""))
+
+		dependencies_by_bundle[symbolic_name] = sorted(set(dependency for dependency in dependencies if dependency != symbolic_name))
+
+	# Topological sort. Packages may depend on each other in cycles, in that case bundle with fewest unresolved dependencies is taken first.
+	remaining:Dict[str, List[str]] = {symbolic_name: list(dependencies) for symbolic_name, dependencies in dependencies_by_bundle.items()}
+	ordered:List[str] = []
+	while remaining:
+		ready:List[str] = sorted(symbolic_name for symbolic_name, dependencies in remaining.items() if not dependencies)
+		if not ready:
+			ready = [min(remaining, key=lambda symbolic_name: (len(remaining[symbolic_name]), symbolic_name))]
+
+		for symbolic_name in ready:
+			del remaining[symbolic_name]
+			ordered.append(symbolic_name)
+		for dependencies in remaining.values():
+			dependencies[:] = [dependency for dependency in dependencies if dependency not in ready]
+
+	for symbolic_name in ordered:
+		jar_path, bundle_info = selected[symbolic_name]
+		resolution.install_order.append(jar_path)
+		if not bundle_info["fragment_host"]:
+			resolution.start_order.append(symbolic_name)
+	return resolution
 
 def find_bundle_jars(root_dir:str) -> List[str]:
+	"""Equinox console commands that install and start one version of every bundle under root_dir in dependency order."""
+	resolution:BundleResolution = resolve_bundles(index_bundle_jars(root_dir))
+
+	for duplicate in resolution.duplicates:
+		print("Skipping older version of bundle: " + duplicate, file=sys.stderr)
+	for unresolved in resolution.unresolved:
+		print("Unresolved: " + unresolved, file=sys.stderr)
+
 	commands:List[str] = []
-	for dirpath, _, filenames in os.walk(root_dir):
-		for filename in filenames:
-			if filename.lower().endswith(".jar"):
-				jar_path = os.path.join(dirpath, filename)
-				if is_osgi_bundle(jar_path):
-					# Convert the path for the file URL scheme (adjust if needed)
-					file_url:str = "file:" + jar_path.replace("\\", "/")
-					command:str = f"install {file_url}"
-					commands.append(command)
+	for jar_path in resolution.install_order:
+		# Convert the path for the file URL scheme (adjust if needed)
+		file_url:str = "file:" + jar_path.replace("\\", "/")
+		command:str = f"install {file_url}"
+		commands.append(command)
+	for symbolic_name in resolution.start_order:
+		commands.append(f"start {symbolic_name}")
 	return commands
 
 if __name__ == "__main__":
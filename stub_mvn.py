@@ -0,0 +1,137 @@
+from typing import List
+
+import xml.etree.ElementTree as ET
+import shutil
+import sys
+import time
+import os
+
+# Stand-in for mvn.bat used by benchmark.py. Prints maven 2.2.1 like output and creates the same files into target\ that auto_build.py expects from maven.
+# Usage: python stub_mvn.py <seconds to sleep> <maven arguments>
+
+# Size of created jar and swc files.
+ARTIFACT_SIZE = 64 * 1024
+
+SEPARATOR = "[INFO] ------------------------------------------------------------------------"
+
+def read_pom(path:str) -> ET.Element:
+	it = ET.iterparse(path)
+	for _, el in it:
+		_, _, el.tag = el.tag.rpartition('}')
+	return it.root
+
+def read_text(root:ET.Element, tag:str) -> str:
+	element = root.find(tag)
+	if element is None or element.text is None:
+		return ""
+	return element.text.strip()
+
+def write_artifact(path:str, seed:str):
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	block:bytes = (seed + "\n").encode("utf-8")
+	with open(path, "wb") as f:
+		f.write((block * (ARTIFACT_SIZE // len(block) + 1))[:ARTIFACT_SIZE])
+
+def generate_models_base(work_dir:str, group_id:str, artifact_id:str, version:str) -> List[str]:
+	"""Generate the client side ModelsBase project of a server project like platform.server.tools.generator.maven:Flash does."""
+	generation_result_path:str = os.path.join(work_dir, "target\\client\\fp10\\")
+	os.makedirs(generation_result_path, exist_ok=True)
+
+	models_base_group_id:str = group_id.replace(".server", ".client")
+	models_base_artifact_id:str = artifact_id + "ModelsBase"
+	with open(os.path.join(generation_result_path, "pom.xml"), "w") as f:
+		f.write(f"""<?xml version="1.0" encoding="UTF-8"?>
+<project xmlns="http://maven.apache.org/POM/4.0.0">
+	<modelVersion>4.0.0</modelVersion>
+	<groupId>{models_base_group_id}</groupId>
+	<artifactId>{models_base_artifact_id}</artifactId>
+	<version>{version}</version>
+	<packaging>swc</packaging>
+</project>
+""")
+
+	with open(os.path.join(work_dir, "target\\classes\\models.xml"), "r") as f:
+		model_count:int = f.read().count("<model ")
+
+	source_path:str = os.path.join(generation_result_path, "src\\")
+	os.makedirs(source_path, exist_ok=True)
+	for i in range(model_count):
+		with open(os.path.join(source_path, f"Model{i}Base.as"), "w") as f:
+			f.write(f"package {models_base_group_id} {{ public class Model{i}Base {{}} }}\n")
+
+	return [
+		"[INFO] [generator:generate]",
+		f"[INFO] Generating {model_count} models to {generation_result_path}",
+	]
+
+def compile_project(work_dir:str, group_id:str, artifact_id:str, version:str, packaging:str) -> List[str]:
+	lines:List[str] = ["[INFO] [clean:clean]", "[INFO] Deleting directory " + os.path.join(work_dir, "target")]
+
+	source_file_count:int = 0
+	for _, _, filenames in os.walk(work_dir):
+		source_file_count += len([filename for filename in filenames if filename.endswith(".java") or filename.endswith(".as")])
+
+	models_xml_path:str = os.path.join(work_dir, "src\\main\\resources\\models.xml")
+	if os.path.exists(models_xml_path):
+		os.makedirs(os.path.join(work_dir, "target\\classes\\"), exist_ok=True)
+		shutil.copy(models_xml_path, os.path.join(work_dir, "target\\classes\\models.xml"))
+		lines.append("[INFO] [resources:resources]")
+		lines.append("[INFO] Copying 1 resource")
+
+	if packaging == "pom":
+		return lines
+
+	lines.append("[INFO] [compiler:compile]")
+	lines.append("[INFO] Compiling " + str(source_file_count) + " source files to " + os.path.join(work_dir, "target\\classes"))
+
+	extension:str = "swc" if packaging == "swc" else "jar"
+	artifact_path:str = os.path.join(work_dir, "target\\" + artifact_id + "-" + version + "." + extension)
+	write_artifact(artifact_path, group_id + ":" + artifact_id + ":" + version)
+	lines.append(f"[INFO] [{extension}:{extension}]")
+	lines.append(f"[INFO] Building {extension}: {artifact_path}")
+	return lines
+
+def run(seconds:float, maven_arguments:List[str]) -> int:
+	start_time:float = time.time()
+	work_dir:str = os.getcwd()
+	pom_path:str = os.path.join(work_dir, "pom.xml")
+	if not os.path.exists(pom_path):
+		print("[INFO] Scanning for projects...")
+		print("[ERROR] BUILD ERROR")
+		print("[INFO] Cannot execute mojo: resources. It requires a project with an existing pom.xml, but the build is not using one.")
+		return 1
+
+	root:ET.Element = read_pom(pom_path)
+	group_id:str = read_text(root, "groupId")
+	artifact_id:str = read_text(root, "artifactId")
+	version:str = read_text(root, "version")
+	packaging:str = read_text(root, "packaging") or "jar"
+	goals:List[str] = [argument for argument in maven_arguments if not argument.startswith("-") and argument != "release"]
+
+	print("[INFO] Scanning for projects...")
+	print(SEPARATOR)
+	print(f"[INFO] Building {artifact_id}")
+	print(f"[INFO]    task-segment: [{', '.join(goals)}]")
+	print(SEPARATOR)
+
+	time.sleep(seconds)
+
+	if any(goal.endswith(":generate") for goal in goals):
+		lines = generate_models_base(work_dir, group_id, artifact_id, version)
+	else:
+		lines = compile_project(work_dir, group_id, artifact_id, version, packaging)
+
+	for line in lines:
+		print(line)
+	print("[INFO] [install:install]")
+	print(f"[INFO] Installing {pom_path}")
+	print(SEPARATOR)
+	print("[INFO] BUILD SUCCESSFUL")
+	print(SEPARATOR)
+	print(f"[INFO] Total time: {max(1, round(time.time() - start_time))} second")
+	print(f"[INFO] Finished at: {time.strftime('%a %b %d %H:%M:%S %Z %Y')}")
+	print(SEPARATOR)
+	return 0
+
+if __name__ == "__main__":
+	sys.exit(run(float(sys.argv[1]), sys.argv[2:]))